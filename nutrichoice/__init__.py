@@ -0,0 +1,19 @@
+"""NutriChoice: mesin rekomendasi makanan berbasis kandungan nutrisi."""
+
+from .calories import calculate_calories
+from .catalog import Catalog, convert_csv, load_frame, open_catalog
+from .data import FEATURES, clean, dataset_hash, load_csv
+from .index import FoodIndex
+
+__all__ = [
+    'Catalog',
+    'FEATURES',
+    'FoodIndex',
+    'calculate_calories',
+    'clean',
+    'convert_csv',
+    'dataset_hash',
+    'load_csv',
+    'load_frame',
+    'open_catalog',
+]
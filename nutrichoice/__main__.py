@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import urllib.request
+from urllib.parse import urlencode
+
+import numpy as np
+
+import pandas as pd
+
+from . import benchmark, metrics
+from .backends import BACKENDS, recall_report
+from .batch import recommend_for_names, recommend_for_vectors
+from .calories import ACTIVITY_SCALES, BMR_FORMULAS, calorie_table
+from .catalog import convert_csv
+from .data import FEATURES, read_table, write_table
+from .evaluation import knn_agreement
+from .index import FoodIndex
+from .ingest import PLAUSIBILITY, REASONS, ingest
+from .neighbor_table import NeighborTable
+from .result_cache import ResultCache
+from .server import run_load, serve
+from .similarity import METRICS, parse_weights
+from .thumbnails import ThumbnailCache
+from .weekly_planner import macro_targets, plan_weeks
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'nutrition.csv')
+
+
+def cache_dir_for(args):
+    return os.path.join(os.path.dirname(os.path.abspath(args.data)), '.nutrichoice')
+
+
+def load_index(args):
+    return FoodIndex.from_csv(args.data, cache_dir=cache_dir_for(args), backend=args.backend)
+
+
+def cmd_evaluate(args):
+    index = load_index(args)
+    report = knn_agreement(index, topn=args.topn, chunk_size=args.chunk_size)
+    write_table(report, args.output)
+    print(f"Evaluasi Top-{args.topn} untuk {len(report)} makanan disimpan ke {args.output}")
+    print(f"Rata-rata kesesuaian KNN vs Euclidean: {report['agreement'].mean():.2%}")
+
+
+def cmd_recommend(args):
+    index = load_index(args)
+    options = dict(n_neighbors=args.k, chunk_size=args.chunk_size, n_jobs=args.jobs, metric=args.metric,
+                   weights=parse_weights(args.weights, index.features) if args.weights else None)
+    if args.vectors:
+        result = recommend_for_vectors(index, pd.read_csv(args.vectors), **options)
+    else:
+        names = list(args.names or [])
+        if args.names_file:
+            with open(args.names_file, encoding='utf-8') as f:
+                names += [line.strip() for line in f if line.strip()]
+        result, missing = recommend_for_names(index, names, **options)
+        for name in missing:
+            print(f"⚠️  Makanan '{name}' tidak ditemukan dalam dataset.", file=sys.stderr)
+    write_table(result, args.output)
+    print(f"{len(result)} baris rekomendasi disimpan ke {args.output}")
+
+
+def cmd_build_table(args):
+    index = load_index(args)
+    table = NeighborTable.build(index, k=args.k, chunk_size=args.chunk_size, n_jobs=args.jobs)
+    path = table.save(NeighborTable.cache_path(cache_dir_for(args), index.version, args.k, index.backend))
+    print(f"Tabel {len(table)} x {table.k} tetangga disimpan ke {path}")
+
+
+def cmd_convert(args):
+    output = args.output or os.path.join(cache_dir_for(args), 'catalog')
+    catalog = convert_csv(args.data, output, chunksize=args.chunk_size)
+    print(f"Katalog {len(catalog)} baris ({', '.join(catalog.columns)}) disimpan ke {output}")
+
+
+def cmd_ingest(args):
+    atwater = None if args.no_atwater else args.atwater_tolerance
+    catalog, report = ingest(args.source, args.output, chunksize=args.chunk_size, rejects_path=args.rejects,
+                             atwater_tolerance=atwater, strict=args.strict)
+    print(f"{report['rows_read']} baris dibaca dalam {report['chunks']} blok, "
+          f"{report['rows_written']} baris ditulis ke {args.output}")
+    for reason in REASONS:
+        if report['rejected'][reason]:
+            print(f"  ditolak ({reason}): {report['rejected'][reason]}")
+    for reason in PLAUSIBILITY:
+        if report['warnings'][reason]:
+            print(f"  peringatan ({reason}), tetap ditulis: {report['warnings'][reason]}")
+    if args.rejects and report['rows_read'] > report['rows_written']:
+        print(f"Baris yang ditolak disimpan ke {args.rejects}")
+    print(f"Gunakan katalog ini dengan: python -m nutrichoice --data {args.output} <perintah>")
+
+
+def cmd_thumbnails(args):
+    index = load_index(args)
+    cache = ThumbnailCache(os.path.join(cache_dir_for(args), 'thumbnails'), width=args.width,
+                           max_bytes=args.max_mb * 1024 * 1024)
+    stats = cache.prefetch(index.df['image'].tolist(), workers=args.workers, refresh=args.refresh)
+    print(f"Thumbnail: {stats['fetched']} diunduh, {stats['cached']} sudah ada, "
+          f"{stats['failed']} gagal, {stats['evicted']} dibuang ({cache.cache_dir})")
+
+
+def cmd_serve(args):
+    index = load_index(args).load_or_build_table(cache_dir_for(args))
+    disk_path = os.path.join(cache_dir_for(args), 'results.sqlite') if args.shared_cache else None
+    index.use_result_cache(ResultCache(max_entries=args.cache_size, ttl=args.cache_ttl, disk_path=disk_path))
+    try:
+        asyncio.run(serve(index, args.host, args.port, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+def loadgen_paths(index, n=200, seed=0):
+    """Campuran request realistis: pencarian nama, rekomendasi per nama dan
+    query vektor nutrisi (yang melewati micro-batching)."""
+    rng = np.random.default_rng(seed)
+    names = index.df['name'].to_numpy(dtype=object)
+    X = index.df[index.features].to_numpy(dtype=float)
+    paths = []
+    for i in range(n):
+        row = int(rng.integers(len(names)))
+        kind = i % 3
+        if kind == 0:
+            paths.append('/search?' + urlencode({'q': names[row].split()[0], 'limit': 10}))
+        elif kind == 1:
+            paths.append('/recommend?' + urlencode({'name': names[row], 'k': 5}))
+        else:
+            vector = X[row] * rng.uniform(0.8, 1.2, size=X.shape[1])
+            paths.append('/similar?' + urlencode({**dict(zip(index.features, np.round(vector, 1))), 'k': 5}))
+    return paths
+
+
+def cmd_loadgen(args):
+    index = load_index(args)
+    stats = asyncio.run(run_load(args.host, args.port, loadgen_paths(index),
+                                 concurrency=args.concurrency, requests=args.requests))
+    print(f"{stats['requests']} request dalam {stats['seconds']:.2f} dtk "
+          f"({stats['throughput']:.0f} req/dtk), {stats['errors']} error")
+    print(f"Latensi p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
+    with urllib.request.urlopen(f"http://{args.host}:{args.port}/stats", timeout=10) as response:
+        batcher = json.load(response)['kneighbors_batcher']
+    print(f"Micro-batching server: {batcher['queries']} query dalam {batcher['batches']} batch "
+          f"(rata-rata {batcher['mean_batch_size']}, maks {batcher['largest_batch']}), "
+          f"p50 {batcher['p50_ms']} ms, p99 {batcher['p99_ms']} ms")
+
+
+def cmd_bench(args):
+    report = benchmark.run(args.sizes, workdir=args.workdir, repeat=args.repeat, queries=args.queries)
+    print(benchmark.format_report(report))
+    if args.output:
+        benchmark.save_report(report, args.output)
+        print(f"Hasil benchmark disimpan ke {args.output}")
+    if not args.baseline:
+        return 0
+    rows = benchmark.compare(report, benchmark.load_report(args.baseline), tolerance=args.tolerance)
+    regressions = [row for row in rows if row[-1]]
+    for size, stage, current, previous, ratio, _ in regressions:
+        print(f"⚠️  Regresi {stage} ({size} baris): p50 {current:.3f} ms vs baseline {previous:.3f} ms (x{ratio:.2f})")
+    print(f"{len(rows)} tahap dibandingkan dengan {args.baseline}, {len(regressions)} regresi")
+    return 1 if regressions else 0
+
+
+def cmd_backends(args):
+    if args.synthetic:
+        index = FoodIndex(benchmark.synthetic_catalog(benchmark.parse_size(args.synthetic))).fit()
+    else:
+        index = load_index(args)
+    report = recall_report(index, backends=args.backends, k=args.k, n_queries=args.queries, nprobes=args.nprobe)
+    print(f"Recall@{args.k} vs brute force, {len(index.df)} makanan, {min(args.queries, len(index.df))} query")
+    print(report.to_string(index=False))
+    if args.output:
+        write_table(report, args.output)
+        print(f"Laporan disimpan ke {args.output}")
+
+
+def cmd_weekly(args):
+    index = load_index(args)
+    if args.profiles:
+        profiles = pd.read_csv(args.profiles)
+        targets_list = [macro_targets(row['calories']) | {m: row[m] for m in FEATURES if m in row and pd.notna(row[m])}
+                        for row in profiles.to_dict('records')]
+    else:
+        targets_list = [macro_targets(c) for c in args.calories]
+    plans = plan_weeks(index.df, targets_list, n_days=args.days, no_repeat_days=args.no_repeat,
+                       processes=args.jobs)
+    rows = []
+    for profile, plan in enumerate(plans):
+        if plan is None:
+            print(f"⚠️  Profil {profile + 1}: tidak ada rencana yang memenuhi batasan.", file=sys.stderr)
+            continue
+        for day, day_plan in enumerate(plan.days, start=1):
+            for meal, positions in day_plan.meals.items():
+                for record in index.df.iloc[positions][['name', 'type'] + FEATURES].to_dict('records'):
+                    rows.append({'profile': profile + 1, 'day': day, 'meal': meal, **record})
+    result = pd.DataFrame(rows)
+    write_table(result, args.output)
+    print(f"Rencana {args.days} hari untuk {len(plans)} profil ({len(result)} baris) disimpan ke {args.output}")
+
+
+def cmd_calories(args):
+    profiles = read_table(args.profiles)
+    result = calorie_table(profiles, formula=args.formula, scale=args.activity_scale, deficits=args.deficits)
+    write_table(result, args.output)
+    print(f"Kebutuhan kalori {len(result)} profil ({args.formula}) disimpan ke {args.output}")
+    print(f"Rata-rata BMR {result['bmr'].mean():.0f} kkal, TDEE {result['tdee'].mean():.0f} kkal")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m nutrichoice', description="Perintah batch NutriChoice.")
+    parser.add_argument('--data', default=DEFAULT_DATA, help="Path nutrition.csv atau folder katalog hasil ingest")
+    parser.add_argument('--backend', default='auto', choices=list(BACKENDS),
+                        help="Struktur tetangga terdekat (ivf/ivfpq = aproksimasi untuk katalog besar)")
+    parser.add_argument('--metrics', help="Simpan timer dan counter setelah perintah selesai "
+                                          "(.prom/.txt = teks Prometheus, selain itu JSON)")
+    parser.add_argument('--profile', action='store_true', help="Jalankan perintah di bawah cProfile dan cetak ringkasannya")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    evaluate = subparsers.add_parser('evaluate', help="Evaluasi Top-N KNN vs jarak Euclidean untuk seluruh katalog")
+    evaluate.add_argument('--topn', type=int, default=5)
+    evaluate.add_argument('--chunk-size', type=int, default=1024)
+    evaluate.add_argument('--output', default='evaluasi_topn.csv', help="File laporan (.csv atau .parquet)")
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    recommend = subparsers.add_parser('recommend', help="Rekomendasi batch untuk banyak nama makanan atau vektor nutrisi")
+    source = recommend.add_mutually_exclusive_group(required=True)
+    source.add_argument('--names', nargs='+', help="Daftar nama makanan")
+    source.add_argument('--names-file', help="File teks berisi satu nama makanan per baris")
+    source.add_argument('--vectors', help="CSV berisi kolom calories, proteins, fat, carbohydrate")
+    recommend.add_argument('-k', type=int, default=5, help="Jumlah rekomendasi per query")
+    recommend.add_argument('--chunk-size', type=int, default=4096)
+    recommend.add_argument('--jobs', type=int, default=1, help="Jumlah thread paralel (-1 = semua core)")
+    recommend.add_argument('--weights', help="Bobot fitur, mis. proteins=3,fat=0.5 (fitur lain 1)")
+    recommend.add_argument('--metric', choices=METRICS, help="Metrik kemiripan berbobot (default: KNN euclidean)")
+    recommend.add_argument('--output', default='rekomendasi.csv', help="File hasil (.csv atau .parquet)")
+    recommend.set_defaults(func=cmd_recommend)
+
+    build_table = subparsers.add_parser('build-table', help="Hitung tabel top-K tetangga untuk seluruh katalog")
+    build_table.add_argument('-k', type=int, default=10)
+    build_table.add_argument('--chunk-size', type=int, default=4096)
+    build_table.add_argument('--jobs', type=int, default=1)
+    build_table.set_defaults(func=cmd_build_table)
+
+    convert = subparsers.add_parser('convert', help="Konversi nutrition.csv ke katalog biner kolomar")
+    convert.add_argument('--output', help="Folder katalog (default: .nutrichoice/catalog di samping CSV)")
+    convert.add_argument('--chunk-size', type=int, default=100_000)
+    convert.set_defaults(func=cmd_convert)
+
+    ingest_parser = subparsers.add_parser(
+        'ingest', help="Ingest bertahap dataset nutrisi besar (CSV/Parquet) dengan validasi dan deduplikasi")
+    ingest_parser.add_argument('source', help="File sumber (.csv atau .parquet)")
+    ingest_parser.add_argument('--output', required=True, help="Folder katalog hasil")
+    ingest_parser.add_argument('--chunk-size', type=int, default=100_000)
+    ingest_parser.add_argument('--rejects', help="CSV untuk baris yang ditolak (dengan kolom alasan)")
+    ingest_parser.add_argument('--atwater-tolerance', type=float, default=0.6,
+                               help="Selisih relatif maksimum kalori vs 4P + 9L + 4K")
+    ingest_parser.add_argument('--no-atwater', action='store_true', help="Lewati pemeriksaan konsistensi kalori")
+    ingest_parser.add_argument('--strict', action='store_true',
+                               help="Tolak baris di luar rentang / tidak konsisten Atwater (default: hanya peringatan)")
+    ingest_parser.set_defaults(func=cmd_ingest)
+
+    thumbnails = subparsers.add_parser(
+        'thumbnails', help="Unduh dan perkecil gambar makanan ke cache thumbnail lokal "
+                           "(gunakan --data streamlit/nutrition.csv untuk cache aplikasi Streamlit)")
+    thumbnails.add_argument('--workers', type=int, default=16)
+    thumbnails.add_argument('--width', type=int, default=140)
+    thumbnails.add_argument('--max-mb', type=int, default=200, help="Batas ukuran cache (MB)")
+    thumbnails.add_argument('--refresh', action='store_true', help="Unduh ulang walaupun sudah ada di cache")
+    thumbnails.set_defaults(func=cmd_thumbnails)
+
+    server = subparsers.add_parser('serve', help="Jalankan layanan HTTP JSON (asyncio)")
+    server.add_argument('--host', default='127.0.0.1')
+    server.add_argument('--port', type=int, default=8000)
+    server.add_argument('--max-batch', type=int, default=64, help="Maksimum query kneighbors per batch")
+    server.add_argument('--max-wait-ms', type=float, default=2.0, help="Waktu tunggu maksimum untuk mengisi batch")
+    server.add_argument('--cache-size', type=int, default=4096, help="Maksimum entri cache hasil di memori")
+    server.add_argument('--cache-ttl', type=float, help="Umur maksimum entri cache (detik)")
+    server.add_argument('--shared-cache', action='store_true',
+                        help="Tambahkan lapisan cache SQLite di .nutrichoice yang dipakai bersama antar proses")
+    server.set_defaults(func=cmd_serve)
+
+    loadgen = subparsers.add_parser('loadgen', help="Load generator lokal untuk layanan 'serve'")
+    loadgen.add_argument('--host', default='127.0.0.1')
+    loadgen.add_argument('--port', type=int, default=8000)
+    loadgen.add_argument('--concurrency', type=int, default=32, help="Jumlah koneksi bersamaan")
+    loadgen.add_argument('--requests', type=int, default=2000)
+    loadgen.set_defaults(func=cmd_loadgen)
+
+    bench = subparsers.add_parser('bench', help="Benchmark semua jalur rekomendasi pada katalog sintetis")
+    bench.add_argument('--sizes', nargs='+', default=['1k', '100k'],
+                       help="Ukuran katalog: 1k, 100k, 1m, 10m atau angka")
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.add_argument('--queries', type=int, default=200, help="Jumlah query untuk tahap per-query")
+    bench.add_argument('--workdir', help="Folder CSV sintetis (dipakai ulang antar run)")
+    bench.add_argument('--output', help="Simpan hasil sebagai JSON (mis. untuk baseline)")
+    bench.add_argument('--baseline', help="JSON hasil sebelumnya untuk dibandingkan")
+    bench.add_argument('--tolerance', type=float, default=0.2, help="Batas kenaikan p50 sebelum dianggap regresi")
+    bench.set_defaults(func=cmd_bench)
+
+    backends = subparsers.add_parser('backends', help="Laporan recall vs latensi setiap backend tetangga terdekat")
+    backends.add_argument('--backends', nargs='+', default=['brute', 'kd_tree', 'ball_tree', 'ivf', 'ivfpq'],
+                          choices=list(BACKENDS))
+    backends.add_argument('-k', type=int, default=10)
+    backends.add_argument('--queries', type=int, default=1000)
+    backends.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 16], help="Nilai nprobe untuk backend IVF")
+    backends.add_argument('--synthetic', help="Pakai katalog sintetis (mis. 1m) alih-alih --data")
+    backends.add_argument('--output', help="File laporan (.csv atau .parquet)")
+    backends.set_defaults(func=cmd_backends)
+
+    weekly = subparsers.add_parser('weekly', help="Rencana menu beberapa hari dengan target makro dan variasi")
+    source = weekly.add_mutually_exclusive_group(required=True)
+    source.add_argument('--calories', type=float, nargs='+', help="Kebutuhan kalori harian, satu per profil")
+    source.add_argument('--profiles', help="CSV berisi kolom calories (opsional: proteins, fat, carbohydrate)")
+    weekly.add_argument('--days', type=int, default=7)
+    weekly.add_argument('--no-repeat', type=int, default=3, help="Hidangan tidak diulang dalam N hari")
+    weekly.add_argument('--jobs', type=int, default=1, help="Jumlah proses (-1 = semua core, 1 = tanpa pool)")
+    weekly.add_argument('--output', default='rencana_mingguan.csv', help="File hasil (.csv atau .parquet)")
+    weekly.set_defaults(func=cmd_weekly)
+
+    calories = subparsers.add_parser('calories', help="Hitung BMR, TDEE dan target defisit untuk banyak profil")
+    calories.add_argument('--profiles', required=True,
+                          help="CSV/Parquet berisi kolom gender, weight, height, age, activity")
+    calories.add_argument('--formula', default='harris_benedict', choices=list(BMR_FORMULAS))
+    calories.add_argument('--activity-scale', default='umum', choices=list(ACTIVITY_SCALES),
+                          help="umum: sedikit..sangat tinggi; pal: rendah/sedang/tinggi per jenis kelamin")
+    calories.add_argument('--deficits', type=int, nargs='+', default=[500, 750], help="Defisit kalori (kkal)")
+    calories.add_argument('--output', default='kebutuhan_kalori.csv', help="File hasil (.csv atau .parquet)")
+    calories.set_defaults(func=cmd_calories)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        metrics.REGISTRY.start_profiling()
+    try:
+        with metrics.span(args.command):
+            return args.func(args)
+    finally:
+        if args.profile:
+            print(metrics.REGISTRY.stop_profiling(), file=sys.stderr)
+        if args.metrics:
+            metrics.REGISTRY.write(args.metrics)
+            print(f"Metrik disimpan ke {args.metrics}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+
+def kneighbors_chunked(index, X, n_neighbors=None, chunk_size=4096, n_jobs=1):
+    """``index.kneighbors`` untuk banyak vektor sekaligus, diproses per blok.
+
+    Dengan ``n_jobs`` > 1 (atau -1 untuk semua core) blok-blok dijalankan
+    paralel di thread terpisah; numpy/BLAS melepas GIL selama perhitungan.
+    """
+    X = np.asarray(X, dtype=float).reshape(-1, len(index.features))
+    n_neighbors = n_neighbors or index.n_neighbors
+    if len(X) == 0:
+        return np.empty((0, n_neighbors)), np.empty((0, n_neighbors), dtype=np.intp)
+    chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+    if n_jobs == 1 or len(chunks) == 1:
+        results = [index.kneighbors(chunk, n_neighbors) for chunk in chunks]
+    else:
+        results = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(index.kneighbors)(chunk, n_neighbors) for chunk in chunks
+        )
+    distances = np.vstack([d for d, _ in results])
+    indices = np.vstack([i for _, i in results])
+    return distances, indices
+
+
+def weighted_chunked(index, X, n_neighbors=None, weights=None, metric='euclidean', exclude=None):
+    """``index.similarity.top_k`` untuk banyak vektor nutrisi mentah.
+
+    Blok query dibatasi sekitar 16 juta sel (query x katalog) agar memori
+    matriks jarak tetap kecil untuk katalog besar.
+    """
+    X = np.asarray(X, dtype=float).reshape(-1, len(index.features))
+    n_neighbors = n_neighbors or index.n_neighbors
+    weights = index.feature_weights(weights)
+    chunk_size = max(1, 2 ** 24 // max(1, len(index.df)))
+    results = []
+    for start in range(0, len(X), chunk_size):
+        Z = index.transform(X[start:start + chunk_size])
+        skip = None if exclude is None else np.asarray(exclude)[start:start + chunk_size]
+        results.append(index.similarity.top_k(Z, n_neighbors, weights=weights, metric=metric, exclude=skip))
+    if not results:
+        return np.empty((0, n_neighbors)), np.empty((0, n_neighbors), dtype=np.intp)
+    return np.vstack([d for d, _ in results]), np.vstack([i for _, i in results])
+
+
+def _to_frame(index, queries, distances, indices):
+    k = indices.shape[1]
+    result = index.df.iloc[indices.ravel()][['name'] + index.features].reset_index(drop=True)
+    result.insert(0, 'rank', np.tile(np.arange(1, k + 1), len(queries)))
+    result.insert(0, 'query', np.repeat(np.asarray(queries, dtype=object), k))
+    result['distance'] = distances.ravel()
+    return result
+
+
+def recommend_for_names(index, names, n_neighbors=5, chunk_size=4096, n_jobs=1, weights=None, metric=None):
+    """Rekomendasi untuk banyak nama makanan dalam satu panggilan kneighbors.
+
+    Seperti ``FoodIndex.query``, makanan itu sendiri tidak ikut dihitung
+    sebagai rekomendasi. Mengembalikan ``(hasil, nama_tidak_ditemukan)``;
+    hasil berformat panjang dengan kolom query, rank, name, fitur, distance.
+    Dengan ``weights`` / ``metric`` dipakai kemiripan berbobot
+    (``weighted_chunked``).
+    """
+    rows, found, missing = [], [], []
+    for name in names:
+        row = index.lookup(name)
+        if row is None:
+            missing.append(name)
+        else:
+            rows.append(row)
+            found.append(name)
+    X = index.df[index.features].to_numpy(dtype=float)[rows]
+    if weights is not None or metric is not None:
+        distances, indices = weighted_chunked(index, X, n_neighbors, weights, metric or 'euclidean', exclude=rows)
+        return _to_frame(index, found, distances, indices), missing
+    distances, indices = kneighbors_chunked(index, X, n_neighbors + 1, chunk_size, n_jobs)
+
+    # Buang makanan itu sendiri; jika tidak muncul, buang kolom terakhir
+    is_self = indices == np.asarray(rows, dtype=np.intp)[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    keep = ~is_self
+    shape = (len(rows), n_neighbors)
+    return _to_frame(index, found, distances[keep].reshape(shape), indices[keep].reshape(shape)), missing
+
+
+def recommend_for_vectors(index, vectors, n_neighbors=5, chunk_size=4096, n_jobs=1, weights=None, metric=None):
+    """Rekomendasi untuk banyak vektor nutrisi (DataFrame berkolom fitur atau
+    array n x fitur). Kolom ``query`` berisi nomor baris input."""
+    if isinstance(vectors, pd.DataFrame):
+        vectors = vectors[index.features]
+    X = np.asarray(vectors, dtype=float).reshape(-1, len(index.features))
+    if weights is not None or metric is not None:
+        distances, indices = weighted_chunked(index, X, n_neighbors, weights, metric or 'euclidean')
+    else:
+        distances, indices = kneighbors_chunked(index, X, n_neighbors, chunk_size, n_jobs)
+    return _to_frame(index, np.arange(len(X)), distances, indices)
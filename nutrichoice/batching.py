@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+_STOP = object()
+
+
+class LatencyStats:
+    """Menyimpan latensi terakhir (jendela bergulir) untuk menghitung persentil."""
+
+    def __init__(self, window=10_000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            ms = np.asarray(self._samples, dtype=float) * 1000
+        if not len(ms):
+            return {'samples': 0, 'p50_ms': None, 'p99_ms': None}
+        return {
+            'samples': len(ms),
+            'p50_ms': round(float(np.percentile(ms, 50)), 3),
+            'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        }
+
+
+class KNeighborsBatcher:
+    """Penggabung query kneighbors yang datang bersamaan (thread-safe).
+
+    Query dari banyak thread / request dikumpulkan oleh satu thread latar:
+    setelah query pertama masuk, batcher menunggu paling lama
+    ``max_wait_ms`` atau sampai ``max_batch_size`` query terkumpul, lalu
+    menumpuknya menjadi satu matriks. Imputer, scaler dan kneighbors
+    dipanggil sekali untuk seluruh batch dan hasilnya dibagikan kembali ke
+    masing-masing ``Future``.
+    """
+
+    def __init__(self, index, max_batch_size=64, max_wait_ms=2.0):
+        self.index = index
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.latency = LatencyStats()
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='kneighbors-batcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, vector, n_neighbors=None):
+        """Menjadwalkan satu query; hasilnya ``Future`` berisi (distances, indices)
+        berbentuk 1 dimensi."""
+        future = Future()
+        values = np.asarray(vector, dtype=float).reshape(len(self.index.features))
+        self._queue.put((values, n_neighbors or self.index.n_neighbors, future, time.perf_counter()))
+        return future
+
+    def kneighbors(self, vector, n_neighbors=None):
+        return self.submit(vector, n_neighbors).result()
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'queries': self.queries,
+            'mean_batch_size': round(self.queries / self.batches, 2) if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            **self.latency.snapshot(),
+        }
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return None, True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch):
+        X = np.vstack([values for values, _, _, _ in batch])
+        k = max(n for _, n, _, _ in batch)
+        try:
+            distances, indices = self.index.kneighbors(X, k)
+        except Exception as exc:
+            for _, _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.queries += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        now = time.perf_counter()
+        for i, (_, n, future, submitted) in enumerate(batch):
+            future.set_result((distances[i, :n], indices[i, :n]))
+            self.latency.record(now - submitted)
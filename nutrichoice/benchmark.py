@@ -0,0 +1,239 @@
+"""Benchmark seluruh jalur rekomendasi pada katalog sintetis berbagai ukuran.
+
+Katalog dibuat menyerupai nutrition.csv (nama, tipe, kalori dan makro yang
+konsisten dengan faktor Atwater). Setiap ukuran dijalankan di proses
+terpisah, dan puncak RSS diukur per tahap: di Linux penanda puncak
+(VmHWM) di-reset sebelum setiap tahap, sehingga ``peak_rss_mb`` adalah
+puncak selama tahap itu dan ``rss_delta_mb`` kenaikannya dari RSS awal
+tahap. Cache hasil query dimatikan agar yang diukur adalah komputasinya.
+"""
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .batch import kneighbors_chunked
+from .catalog import load_frame, open_catalog
+from .data import FEATURES, clean, load_csv
+from .evaluation import euclidean_topn
+from .index import FoodIndex
+from .meal_planner import plan_meals
+from .result_cache import ResultCache
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS tidak tersedia
+    resource = None
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# Perkiraan komposisi kolom ``type`` pada dataset asli
+TYPE_SHARES = {
+    'Bahan Masakan': 0.49, 'Camilan': 0.15, 'Lauk': 0.12, 'Buah': 0.08, 'Hidangan Lengkap': 0.04,
+    'Sayuran Masak': 0.035, 'Karbo': 0.035, 'Sayuran Mentah': 0.03, 'Minuman': 0.02,
+}
+DISHES = ['Nasi', 'Mie', 'Ayam', 'Ikan', 'Tahu', 'Tempe', 'Sate', 'Soto', 'Bakso', 'Kue',
+          'Roti', 'Sayur', 'Pisang', 'Telur', 'Daging', 'Udang', 'Bubur', 'Keripik', 'Es', 'Jus']
+STYLES = ['Goreng', 'Bakar', 'Rebus', 'Kukus', 'Pedas', 'Manis', 'Asin', 'Segar', 'Kering',
+          'Santan', 'Balado', 'Kecap', 'Panggang', 'Tumis']
+REGIONS = ['Padang', 'Jawa', 'Bali', 'Betawi', 'Medan', 'Sunda', 'Aceh', 'Manado', 'Makassar', 'Lombok']
+
+
+def parse_size(text):
+    text = str(text).lower()
+    return SIZES[text] if text in SIZES else int(text)
+
+
+def synthetic_catalog(n, seed=0):
+    """DataFrame sintetis ``n`` makanan dengan kolom seperti nutrition.csv."""
+    rng = np.random.default_rng(seed)
+    names = (np.array(DISHES, dtype=object)[rng.integers(len(DISHES), size=n)] + ' '
+             + np.array(STYLES, dtype=object)[rng.integers(len(STYLES), size=n)] + ' '
+             + np.array(REGIONS, dtype=object)[rng.integers(len(REGIONS), size=n)])
+    types = np.array(list(TYPE_SHARES), dtype=object)
+    shares = np.array(list(TYPE_SHARES.values()))
+    calories = np.clip(rng.gamma(1.5, 135.0, size=n), 0, 950).round(1)
+    # Porsi energi protein / lemak / karbohidrat, dikonversi ke gram (Atwater 4/9/4)
+    energy = rng.dirichlet([1.0, 1.0, 1.5], size=n) * calories[:, None]
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'calories': calories,
+        'proteins': (energy[:, 0] / 4).round(1),
+        'fat': (energy[:, 1] / 9).round(1),
+        'carbohydrate': (energy[:, 2] / 4).round(1),
+        'name': names,
+        'image': 'https://example.com/img/' + pd.Series(np.arange(n)).astype(str) + '.jpg',
+        'type': types[rng.choice(len(types), size=n, p=shares / shares.sum())],
+    })
+
+
+def _proc_status_mb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _ru_maxrss_mb():
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class _MemoryProbe:
+    """RSS awal dan puncak RSS selama satu tahap.
+
+    Di Linux puncak (VmHWM) di-reset lewat /proc/self/clear_refs sehingga
+    puncak tahap sebelumnya tidak terbawa. Tanpa /proc hanya kenaikan
+    ``ru_maxrss`` yang bisa dilaporkan (0 jika tahap ini tidak melampaui
+    puncak proses sebelumnya).
+    """
+
+    def __enter__(self):
+        try:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+            self.start = _proc_status_mb('VmRSS')
+        except OSError:
+            self.start = None
+        self.start_maxrss = _ru_maxrss_mb()
+        return self
+
+    def __exit__(self, *exc):
+        self.peak = _proc_status_mb('VmHWM') if self.start is not None else None
+
+    def summary(self):
+        if self.peak is not None:
+            return {'peak_rss_mb': self.peak, 'rss_delta_mb': round(self.peak - self.start, 1)}
+        end = _ru_maxrss_mb()
+        return {'peak_rss_mb': None,
+                'rss_delta_mb': None if end is None else round(end - self.start_maxrss, 1)}
+
+
+def _summary(samples, memory, operations=None):
+    ms = np.asarray(samples) * 1000
+    total = float(np.sum(samples))
+    return {
+        'runs': len(samples),
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'throughput': round((operations or len(samples)) / total, 2) if total else None,
+        **memory.summary(),
+    }
+
+
+def _measure(results, stage, fn, args_list, operations=None):
+    """Menjalankan ``fn(*args)`` untuk setiap ``args_list``, menyimpan
+    ringkasan tahap ``stage`` ke ``results`` dan mengembalikan hasil terakhir."""
+    samples, result = [], None
+    with _MemoryProbe() as memory:
+        for args in args_list:
+            start = time.perf_counter()
+            result = fn(*args)
+            samples.append(time.perf_counter() - start)
+    results[stage] = _summary(samples, memory, operations)
+    return result
+
+
+def run_size(n, workdir, repeat=3, queries=200, seed=0):
+    """Menjalankan semua tahap untuk satu ukuran katalog. Hasil per tahap:
+    persentil latensi, throughput (operasi/detik) dan puncak RSS tahap itu."""
+    rng = np.random.default_rng(seed + 1)
+    results = {}
+    csv_path = os.path.join(workdir, f"synthetic-{n}.csv")
+    if not os.path.exists(csv_path):
+        synthetic_catalog(n, seed).to_csv(csv_path, index=False)
+    repeat_io = repeat if n <= 100_000 else 1
+
+    raw = _measure(results, 'load_csv', load_csv, [(csv_path,)] * repeat_io)
+    df = _measure(results, 'clean', clean, [(raw,)] * repeat_io)
+    del raw
+
+    cache_dir = os.path.join(workdir, f".cache-{n}")
+    _measure(results, 'catalog_convert', open_catalog, [(csv_path, cache_dir)])
+    _measure(results, 'catalog_load', load_frame, [(csv_path, cache_dir)] * repeat_io)
+
+    index = FoodIndex(df).use_result_cache(ResultCache(max_entries=0))
+    _measure(results, 'fit', index.fit, [()] * repeat_io)
+
+    X = df[FEATURES].to_numpy(dtype=float)
+    picks = rng.integers(len(df), size=queries)
+    _measure(results, 'kneighbors_single', index.kneighbors, [(X[i:i + 1],) for i in picks])
+    batch = X[rng.integers(len(df), size=min(len(df), 10_000))]
+    _measure(results, 'kneighbors_batch', kneighbors_chunked, [(index, batch, 5)] * repeat,
+             operations=len(batch) * repeat)
+
+    _measure(results, 'nutrient_index_build', index.nutrient_index, [('proteins',)])
+    values = rng.uniform(0, 40, size=queries)
+    _measure(results, 'nutrient_nearest', index.nearest_by_nutrient, [('proteins', v, 10) for v in values])
+
+    terms = [f"{DISHES[rng.integers(len(DISHES))]} {STYLES[rng.integers(len(STYLES))]}" for _ in range(queries)]
+    _measure(results, 'name_index_build', lambda: index.text_index, [()])
+    _measure(results, 'name_search', index.search_names, [(term, False, True, 20) for term in terms])
+    names = df['name']
+    _measure(results, 'name_regex_scan', lambda term: names.str.contains(term, case=False, regex=True),
+             [(term,) for term in terms[:max(1, queries // 10)]])
+
+    _measure(results, 'meal_plan', plan_meals, [(df, t) for t in (1500, 2000, 2500) for _ in range(repeat)])
+
+    sample_names = names.iloc[rng.integers(len(df), size=max(1, queries // 10))].tolist()
+    _measure(results, 'euclidean_topn', euclidean_topn, [(df, name, 5) for name in sample_names])
+    return results
+
+
+def run(sizes, workdir=None, repeat=3, queries=200, seed=0):
+    """Menjalankan benchmark untuk setiap ukuran, masing-masing di proses baru."""
+    workdir = workdir or tempfile.mkdtemp(prefix='nutrichoice-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    report = {'workdir': workdir, 'repeat': repeat, 'queries': queries, 'sizes': {}}
+    context = multiprocessing.get_context('spawn')
+    for size in sizes:
+        n = parse_size(size)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            report['sizes'][str(n)] = pool.submit(run_size, n, workdir, repeat, queries, seed).result()
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Membandingkan p50 setiap tahap dengan baseline. Mengembalikan daftar
+    (ukuran, tahap, p50 sekarang, p50 baseline, rasio, regresi?)."""
+    rows = []
+    for size, stages in report['sizes'].items():
+        for stage, current in stages.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(stage, {})
+            if 'p50_ms' not in current or not previous.get('p50_ms'):
+                continue
+            ratio = current['p50_ms'] / previous['p50_ms']
+            rows.append((size, stage, current['p50_ms'], previous['p50_ms'], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def format_report(report):
+    lines = [f"{'ukuran':>10}  {'tahap':<22}{'p50 ms':>11}{'p99 ms':>11}{'ops/dtk':>13}{'RSS MB':>9}{'+RSS MB':>9}"]
+    for size, stages in report['sizes'].items():
+        for stage, r in stages.items():
+            lines.append(f"{size:>10}  {stage:<22}{r['p50_ms']:>11.3f}{r['p99_ms']:>11.3f}"
+                         f"{r['throughput'] or 0:>13.1f}{r.get('peak_rss_mb') or 0:>9.1f}"
+                         f"{r.get('rss_delta_mb') or 0:>9.1f}")
+    return '\n'.join(lines)
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,117 @@
+import numpy as np
+
+# =======================
+# Registri rumus BMR
+# =======================
+# Koefisien (konstanta, berat kg, tinggi cm, usia tahun) per jenis kelamin
+BMR_FORMULAS = {
+    'harris_benedict': {
+        'pria': (66.5, 13.75, 5.003, -6.75),
+        'wanita': (655.1, 9.563, 1.850, -4.676),
+    },
+    'harris_benedict_revised': {
+        'pria': (88.362, 13.397, 4.799, -5.677),
+        'wanita': (447.593, 9.247, 3.098, -4.330),
+    },
+    'mifflin_st_jeor': {
+        'pria': (5.0, 10.0, 6.25, -5.0),
+        'wanita': (-161.0, 10.0, 6.25, -5.0),
+    },
+}
+
+# Faktor aktivitas: skala 'umum' sama untuk pria dan wanita (dipakai CLI
+# dan API), skala 'pal' berbeda per jenis kelamin (dipakai aplikasi Streamlit)
+ACTIVITY_SCALES = {
+    'umum': {
+        'pria': {'sedikit': 1.2, 'ringan': 1.375, 'sedang': 1.55, 'tinggi': 1.725, 'sangat tinggi': 1.9},
+        'wanita': {'sedikit': 1.2, 'ringan': 1.375, 'sedang': 1.55, 'tinggi': 1.725, 'sangat tinggi': 1.9},
+    },
+    'pal': {
+        'pria': {'rendah': 1.65, 'sedang': 1.76, 'tinggi': 2.10},
+        'wanita': {'rendah': 1.55, 'sedang': 1.70, 'tinggi': 2.00},
+    },
+}
+
+# Label pilihan di aplikasi Streamlit ('Laki-laki'/'Perempuan') ikut diterima
+GENDER_ALIASES = {
+    'pria': 'pria', 'laki-laki': 'pria', 'laki laki': 'pria',
+    'wanita': 'wanita', 'perempuan': 'wanita',
+}
+
+DEFICITS = (500, 750)
+
+
+def _unique_labels(values):
+    """Label unik (huruf kecil, tanpa spasi tepi) dan indeks balik per baris,
+    sehingga pemetaan teks cukup dilakukan sekali per nilai unik."""
+    labels, inverse = np.unique(np.atleast_1d(np.asarray(values, dtype=object)).astype(str), return_inverse=True)
+    return [label.strip().lower() for label in labels], inverse
+
+
+def _is_male(gender):
+    labels, inverse = _unique_labels(gender)
+    genders = [GENDER_ALIASES.get(label) for label in labels]
+    invalid = [label for label, g in zip(labels, genders) if g is None]
+    if invalid:
+        raise ValueError(f"Gender harus 'pria' atau 'wanita' (tidak valid: {', '.join(invalid)}).")
+    return np.array([g == 'pria' for g in genders])[inverse]
+
+
+def bmr(gender, weight, height, age, formula='harris_benedict'):
+    """BMR (kkal/hari) untuk array profil; semua argumen di-broadcast."""
+    if formula not in BMR_FORMULAS:
+        raise ValueError(f"Rumus '{formula}' tidak dikenal. Gunakan: {', '.join(BMR_FORMULAS)}.")
+    male = _is_male(gender)
+    coefficients = np.where(male[:, None], BMR_FORMULAS[formula]['pria'], BMR_FORMULAS[formula]['wanita'])
+    weight, height, age = (np.asarray(v, dtype=float) for v in (weight, height, age))
+    return coefficients[:, 0] + coefficients[:, 1] * weight + coefficients[:, 2] * height + coefficients[:, 3] * age
+
+
+def activity_factor(gender, activity, scale='umum'):
+    """Faktor aktivitas untuk array profil menurut skala ``scale``."""
+    if scale not in ACTIVITY_SCALES:
+        raise ValueError(f"Skala aktivitas '{scale}' tidak dikenal. Gunakan: {', '.join(ACTIVITY_SCALES)}.")
+    male = _is_male(gender)
+    labels, inverse = _unique_labels(activity)
+    male_factors = np.array([ACTIVITY_SCALES[scale]['pria'].get(label, np.nan) for label in labels])[inverse]
+    female_factors = np.array([ACTIVITY_SCALES[scale]['wanita'].get(label, np.nan) for label in labels])[inverse]
+    factors = np.where(male, male_factors, female_factors)
+    if np.isnan(factors).any():
+        raise ValueError(f"Level aktivitas tidak valid. Gunakan: {', '.join(ACTIVITY_SCALES[scale]['pria'])}.")
+    return factors
+
+
+def calorie_targets(gender, weight, height, age, activity, formula='harris_benedict', scale='umum',
+                    deficits=DEFICITS, clamp=False):
+    """BMR, TDEE dan target defisit kalori untuk banyak profil sekaligus.
+
+    Mengembalikan dict array: ``bmr``, ``tdee`` dan ``defisit_<n>`` (TDEE
+    dikurangi n) untuk setiap nilai di ``deficits``. Dengan ``clamp=True``
+    target defisit tidak kurang dari 0 (seperti di aplikasi Streamlit);
+    secara bawaan hasilnya bisa negatif untuk profil dengan TDEE kecil.
+    """
+    result = {'bmr': bmr(gender, weight, height, age, formula)}
+    result['tdee'] = result['bmr'] * activity_factor(gender, activity, scale)
+    for deficit in deficits:
+        target = result['tdee'] - deficit
+        result[f"defisit_{deficit}"] = np.maximum(target, 0.0) if clamp else target
+    return result
+
+
+def calorie_table(profiles, formula='harris_benedict', scale='umum', deficits=DEFICITS):
+    """``profiles`` (kolom gender, weight, height, age, activity) ditambah
+    kolom hasil ``calorie_targets``."""
+    missing = [c for c in ('gender', 'weight', 'height', 'age', 'activity') if c not in profiles.columns]
+    if missing:
+        raise ValueError(f"Kolom profil tidak ditemukan: {', '.join(missing)}.")
+    targets = calorie_targets(profiles['gender'], profiles['weight'], profiles['height'], profiles['age'],
+                              profiles['activity'], formula=formula, scale=scale, deficits=deficits)
+    return profiles.assign(**{name: values.round(2) for name, values in targets.items()})
+
+
+# =======================
+# Fungsi perhitungan BMR & TDEE
+# =======================
+def calculate_calories(gender, weight, height, age, activity_level):
+    targets = calorie_targets(gender, weight, height, age, activity_level)
+    return tuple(round(float(targets[key][0]), 2) for key in ('bmr', 'tdee', 'defisit_500', 'defisit_750'))
@@ -0,0 +1,210 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .data import FEATURES, load_csv
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow opsional: tanpa pyarrow kolom teks didekode ke objek Python
+    pa = None
+
+CATALOG_FORMAT = 1
+
+
+def _column_file(path, column, suffix):
+    return os.path.join(path, f"{column}.{suffix}")
+
+
+class CatalogWriter:
+    """Menulis katalog kolomar secara bertahap (per blok DataFrame).
+
+    Setiap kolom numerik disimpan sebagai file float64 mentah, dan setiap
+    kolom teks sebagai tabel string: blob UTF-8, offset int64, dan mask
+    nilai kosong. Katalog ditulis di folder sementara dan baru dipindahkan
+    ke ``path`` oleh ``close``, sehingga katalog setengah jadi tidak pernah
+    terbaca.
+    """
+
+    def __init__(self, path, numeric_columns, string_columns, columns=None):
+        self.path = path
+        self.numeric_columns = list(numeric_columns)
+        self.string_columns = list(string_columns)
+        self.columns = list(columns) if columns is not None else self.numeric_columns + self.string_columns
+        self.rows = 0
+        self._blob_sizes = {column: 0 for column in self.string_columns}
+        # Ditulis ke folder sementara lalu dipindahkan saat close()
+        self._tmp_path = f"{path}.tmp-{os.getpid()}"
+        if os.path.exists(self._tmp_path):
+            shutil.rmtree(self._tmp_path)
+        os.makedirs(self._tmp_path)
+        self._files = {}
+        for column in self.numeric_columns:
+            self._files[column, 'f64'] = open(_column_file(self._tmp_path, column, 'f64'), 'wb')
+        for column in self.string_columns:
+            for suffix in ('bytes', 'offsets', 'mask'):
+                self._files[column, suffix] = open(_column_file(self._tmp_path, column, suffix), 'wb')
+            np.zeros(1, dtype=np.int64).tofile(self._files[column, 'offsets'])
+
+    def append(self, df):
+        for column in self.numeric_columns:
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+            values.tofile(self._files[column, 'f64'])
+        for column in self.string_columns:
+            missing = df[column].isna().to_numpy()
+            encoded = [b'' if m else str(v).encode('utf-8') for v, m in zip(df[column].tolist(), missing)]
+            lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+            offsets = self._blob_sizes[column] + np.cumsum(lengths)
+            self._files[column, 'bytes'].write(b''.join(encoded))
+            offsets.tofile(self._files[column, 'offsets'])
+            missing.astype(np.uint8).tofile(self._files[column, 'mask'])
+            self._blob_sizes[column] = int(offsets[-1]) if len(offsets) else self._blob_sizes[column]
+        self.rows += len(df)
+
+    def abort(self):
+        """Membatalkan penulisan: file ditutup dan folder sementara dihapus."""
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+    def close(self, source=None):
+        for f in self._files.values():
+            f.close()
+        meta = {
+            'format': CATALOG_FORMAT,
+            'rows': self.rows,
+            'columns': self.columns,
+            'numeric': self.numeric_columns,
+            'strings': self.string_columns,
+            'source': source,
+        }
+        with open(os.path.join(self._tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.replace(self._tmp_path, self.path)
+        return Catalog(self.path)
+
+
+class Catalog:
+    """Katalog kolomar yang dibuka secara malas.
+
+    Kolom numerik dibaca lewat ``np.memmap`` (halaman file dipakai bersama
+    oleh semua proses di mesin yang sama; mode copy-on-write sehingga
+    penulisan hanya mengubah salinan milik proses). Dengan pyarrow, kolom
+    teks juga dibungkus langsung dari file blob/offset yang di-memory-map
+    tanpa dekode; tanpa pyarrow kolom teks baru didekode saat pertama kali
+    diminta.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._strings = {}
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def columns(self):
+        return self.meta['columns']
+
+    def _map(self, column, suffix, dtype):
+        path = _column_file(self.path, column, suffix)
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='c')
+
+    def numeric(self, column):
+        if len(self) == 0:
+            return np.empty(0, dtype=np.float64)
+        return self._map(column, 'f64', np.float64).view(np.ndarray)
+
+    def strings(self, column):
+        """Kolom teks sebagai array objek Python (didekode sekali, lalu disimpan)."""
+        if column not in self._strings:
+            blob = np.fromfile(_column_file(self.path, column, 'bytes'), dtype=np.uint8).tobytes()
+            offsets = np.fromfile(_column_file(self.path, column, 'offsets'), dtype=np.int64)
+            missing = np.fromfile(_column_file(self.path, column, 'mask'), dtype=np.uint8).astype(bool)
+            values = np.array([blob[start:stop].decode('utf-8')
+                               for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist())], dtype=object)
+            values[missing] = None
+            self._strings[column] = values
+        return self._strings[column]
+
+    def string_array(self, column):
+        """Kolom teks sebagai ``StringDtype('pyarrow')`` yang memakai file
+        blob dan offset secara langsung (tanpa salinan). Tanpa pyarrow sama
+        dengan ``strings``."""
+        if pa is None:
+            return self.strings(column)
+        offsets = self._map(column, 'offsets', np.int64)
+        blob = self._map(column, 'bytes', np.uint8)
+        missing = self._map(column, 'mask', np.uint8).view(bool)
+        validity = pa.py_buffer(np.packbits(~missing, bitorder='little')) if missing.any() else None
+        array = pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(offsets), pa.py_buffer(blob), validity)
+        return pd.array(array, dtype=pd.StringDtype('pyarrow'))
+
+    def column(self, column):
+        if column in self.meta['numeric']:
+            return self.numeric(column)
+        return self.string_array(column)
+
+    def to_frame(self, columns=None):
+        """DataFrame yang kolomnya berbagi memori dengan file katalog."""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({column: self.column(column) for column in columns}, copy=False)
+
+
+def _source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+@metrics.timed('catalog_convert')
+def convert_csv(csv_path, out_path, chunksize=100_000, numeric_columns=FEATURES):
+    """Konversi satu kali nutrition.csv ke format katalog kolomar.
+
+    Kolom kosong tanpa nama (koma di akhir baris) dibuang.
+    """
+    writer = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=str):
+        chunk = chunk.loc[:, [c for c in chunk.columns if not c.startswith('Unnamed:')]]
+        if writer is None:
+            numeric = [c for c in chunk.columns if c in numeric_columns]
+            strings = [c for c in chunk.columns if c not in numeric_columns]
+            writer = CatalogWriter(out_path, numeric, strings, columns=chunk.columns)
+        writer.append(chunk)
+    if writer is None:
+        raise ValueError(f"File '{csv_path}' kosong.")
+    return writer.close(source=_source_info(csv_path))
+
+
+def open_catalog(csv_path, cache_dir):
+    """Membuka katalog biner untuk ``csv_path``; dikonversi ulang hanya jika
+    belum ada atau file CSV berubah (ukuran / waktu modifikasi)."""
+    path = os.path.join(cache_dir, 'catalog')
+    try:
+        catalog = Catalog(path)
+        if catalog.meta.get('format') == CATALOG_FORMAT and catalog.meta.get('source') == _source_info(csv_path):
+            return catalog
+    except (OSError, ValueError):
+        pass
+    return convert_csv(csv_path, path)
+
+
+@metrics.timed('load_frame')
+def load_frame(csv_path, cache_dir=None):
+    """Dataset mentah sebagai DataFrame: dari katalog biner jika ``cache_dir``
+    diberikan, atau langsung dari CSV jika tidak. ``csv_path`` juga boleh
+    berupa folder katalog (mis. hasil ``ingest``)."""
+    if os.path.isdir(csv_path):
+        return Catalog(csv_path).to_frame()
+    if cache_dir is None:
+        return load_csv(csv_path)
+    return open_catalog(csv_path, cache_dir).to_frame()
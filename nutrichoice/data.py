@@ -0,0 +1,65 @@
+import hashlib
+
+import pandas as pd
+
+from . import metrics
+
+# Fitur nutrisi makro yang dipakai untuk sistem rekomendasi
+FEATURES = ['calories', 'proteins', 'fat', 'carbohydrate']
+
+
+def load_csv(path):
+    """Membaca dataset nutrisi mentah dari file CSV."""
+    with metrics.span('load_csv'):
+        df = pd.read_csv(path)
+    metrics.count('csv_rows_read', len(df))
+    return df
+
+
+def normalize_types(types):
+    """Tipe makanan huruf kecil tanpa spasi di tepi ('Camilan ' dan 'camilan'
+    menjadi satu), sebagai kolom kategorikal."""
+    return types.str.strip().str.lower().astype('category')
+
+
+@metrics.timed('clean')
+def clean(df, required_cols=None, drop_duplicates=True, features=FEATURES):
+    """Membuang baris tanpa nilai wajib dan (opsional) baris duplikat.
+
+    Secara default kolom wajib adalah fitur nutrisi ditambah ``name``.
+    Kolom ``type`` dinormalisasi sekali di sini (lihat ``normalize_types``).
+    """
+    if required_cols is None:
+        required_cols = list(features) + ['name']
+    # Tanpa .copy() dan tanpa menulis ke df_clean: jika copy-on-write pandas
+    # aktif (bawaan pandas 3) dan tidak ada baris yang dibuang, kolom hasil
+    # load_frame tetap berbagi memori dengan katalog. Tanpa copy-on-write
+    # pandas menyalin kolom di langkah-langkah ini seperti biasa.
+    df_clean = df.dropna(subset=required_cols)
+    if drop_duplicates:
+        df_clean = df_clean.drop_duplicates(subset=list(features) + ['name'])
+    if 'type' in df_clean.columns:
+        df_clean = df_clean.assign(type=normalize_types(df_clean['type']))
+    return df_clean.reset_index(drop=True)
+
+
+def dataset_hash(df, features=FEATURES):
+    """Hash isi dataset (nama + fitur) untuk menandai versi data."""
+    hashed = pd.util.hash_pandas_object(df[['name'] + list(features)], index=False)
+    return hashlib.sha256(hashed.values.tobytes()).hexdigest()
+
+
+def read_table(path):
+    """Membaca CSV, atau Parquet jika ekstensinya .parquet."""
+    if str(path).endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_table(df, path):
+    """Menyimpan DataFrame sebagai CSV, atau Parquet jika ekstensinya .parquet."""
+    if str(path).endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from .data import FEATURES
+
+
+def _squared_distances(queries, X, X_sq):
+    d2 = (queries ** 2).sum(axis=1)[:, None] + X_sq[None, :] - 2.0 * queries @ X.T
+    return np.maximum(d2, 0.0, out=d2)
+
+
+def _topn_rows(d2, topn):
+    """Posisi topn kolom terkecil per baris, terurut naik."""
+    topn = min(topn, d2.shape[1])
+    part = np.argpartition(d2, topn - 1, axis=1)[:, :topn]
+    order = np.argsort(np.take_along_axis(d2, part, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(part, order, axis=1)
+
+
+def euclidean_topn(df, input_name, topn=5, features=FEATURES):
+    """Top-N makanan dengan jarak Euclidean (nilai mentah) terkecil dari
+    ``input_name``. Baris dengan nama yang sama tidak diikutsertakan.
+    Mengembalikan DataFrame dengan kolom ``distance``, atau None jika nama
+    tidak ditemukan."""
+    names = df['name'].to_numpy(dtype=object)
+    matches = np.flatnonzero(names == input_name)
+    if not len(matches):
+        return None
+    X = df[features].to_numpy(dtype=float)
+    d2 = _squared_distances(X[matches[:1]], X, (X ** 2).sum(axis=1))
+    d2[0, names == input_name] = np.inf
+    rows = _topn_rows(d2, topn)[0]
+    rows = rows[np.isfinite(d2[0, rows])]
+    result = df.iloc[rows].copy()
+    result['distance'] = np.sqrt(d2[0, rows])
+    return result
+
+
+def knn_agreement(index, topn=5, chunk_size=1024):
+    """Membandingkan Top-N rekomendasi KNN (fitur terstandardisasi) dengan
+    Top-N jarak Euclidean mentah untuk setiap makanan di katalog.
+
+    Dihitung per blok ``chunk_size`` baris dengan satu perkalian matriks dan
+    ``argpartition`` per blok, sehingga memori tetap O(chunk_size * n).
+    """
+    df = index.df
+    names = df['name'].to_numpy(dtype=object)
+    X = df[index.features].to_numpy(dtype=float)
+    X_sq = (X ** 2).sum(axis=1)
+    n = len(X)
+    topn = min(topn, n - 1)
+
+    knn_rows = np.empty((n, topn), dtype=np.intp)
+    euclid_rows = np.empty((n, topn), dtype=np.intp)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        own = np.arange(start, stop)
+
+        # KNN: ambil topn + 1 lalu buang baris itu sendiri
+        _, indices = index.kneighbors(X[start:stop], n_neighbors=topn + 1)
+        is_self = indices == own[:, None]
+        is_self[~is_self.any(axis=1), -1] = True
+        knn_rows[start:stop] = indices[~is_self].reshape(-1, topn)
+
+        d2 = _squared_distances(X[start:stop], X, X_sq)
+        d2[np.arange(stop - start), own] = np.inf
+        euclid_rows[start:stop] = _topn_rows(d2, topn)
+
+    overlap = (knn_rows[:, :, None] == euclid_rows[:, None, :]).any(axis=2).sum(axis=1)
+    return pd.DataFrame({
+        'name': names,
+        'overlap': overlap,
+        'agreement': overlap / topn,
+        'knn_neighbors': ['; '.join(row) for row in names[knn_rows]],
+        'euclidean_neighbors': ['; '.join(row) for row in names[euclid_rows]],
+    })
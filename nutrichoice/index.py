@@ -0,0 +1,626 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from . import metrics
+from .backends import make_neighbors
+from .catalog import load_frame
+from .data import FEATURES, clean, dataset_hash, normalize_types
+from .meal_planner import plan_meals
+from .neighbor_table import NeighborTable
+from .nutrient_index import NutrientIndex
+from .partitions import TypePartitions
+from .result_cache import ResultCache, normalize_name, quantize
+from .running_stats import RunningStats
+from .similarity import SimilarityMatrix
+from .text_index import TokenIndex, TrigramIndex
+
+
+def build_pipeline(n_neighbors=5, backend='auto'):
+    return Pipeline([
+        ('imputer', SimpleImputer(strategy='mean')),
+        ('scaler', StandardScaler()),
+        ('knn', make_neighbors(backend, n_neighbors))
+    ])
+
+
+class FoodIndex:
+    """Indeks KNN makanan berdasarkan kandungan nutrisi.
+
+    Membungkus pipeline imputer -> scaler -> NearestNeighbors di atas
+    dataset yang sudah dibersihkan. Hasil fit dapat disimpan ke disk dan
+    dimuat kembali selama versi dataset (hash isi data) tidak berubah.
+
+    Makanan dapat ditambah, diubah dan dihapus tanpa fit ulang (lihat
+    ``add``, ``update`` dan ``delete``); fit ulang penuh baru dilakukan jika
+    statistik data bergeser lebih dari ``drift_threshold`` dari statistik
+    scaler saat fit. Perubahan ini tidak thread-safe terhadap query yang
+    sedang berjalan.
+
+    ``backend`` memilih struktur tetangga terdekat (lihat
+    ``backends.BACKENDS``): pencarian eksak 'auto' / 'brute' / 'kd_tree' /
+    'ball_tree', atau aproksimasi 'ivf' / 'ivfpq' untuk katalog besar.
+
+    Hasil ``query``, ``nearest_by_nutrient``, ``query_filtered`` dan
+    ``meal_plans`` disimpan di ``result_cache`` (``ResultCache``, LRU di
+    memori secara default) yang terikat ke versi dataset dan backend.
+    """
+
+    def __init__(self, df, features=FEATURES, n_neighbors=5, version=None, drift_threshold=0.1,
+                 backend='auto'):
+        self.df = df.reset_index(drop=True)
+        self.features = list(features)
+        self.n_neighbors = n_neighbors
+        self.backend = backend
+        self.version = version or dataset_hash(self.df, self.features)
+        self.drift_threshold = drift_threshold
+        self.pipeline = None
+        self.neighbor_table = None
+        self._nutrient_indexes = {}
+        self._name_positions = None
+        self._text_index = None
+        self._fuzzy_index = None
+        self._type_partitions = None
+        self.result_cache = ResultCache(version=self.cache_version)
+        self._reset_incremental()
+
+    @property
+    def cache_version(self):
+        return f"{self.version}-{self.backend}"
+
+    def use_result_cache(self, cache):
+        """Mengganti ``result_cache`` (mis. dengan lapisan disk bersama)."""
+        cache.set_version(self.cache_version)
+        self.result_cache = cache
+        return self
+
+    @classmethod
+    def from_csv(cls, path, required_cols=None, drop_duplicates=True,
+                 features=FEATURES, n_neighbors=5, cache_dir=None, backend='auto'):
+        """Load + clean + fit. Jika ``cache_dir`` diberikan, data dibaca dari
+        katalog biner dan hasil fit dimuat dari (atau disimpan ke) folder
+        tersebut."""
+        df = clean(load_frame(path, cache_dir), required_cols=required_cols,
+                   drop_duplicates=drop_duplicates, features=features)
+        index = cls(df, features=features, n_neighbors=n_neighbors, backend=backend)
+        if cache_dir is None:
+            return index.fit()
+        return index.load_or_fit(cache_dir)
+
+    # =======================
+    # Fit & persistensi
+    # =======================
+    def fit(self):
+        with metrics.span('index_fit'):
+            self.pipeline = build_pipeline(self.n_neighbors, self.backend)
+            self.pipeline.fit(self.df[self.features])
+        metrics.count('index_rows_fitted', len(self.df))
+        self._reset_incremental()
+        return self
+
+    @property
+    def is_fitted(self):
+        return self.pipeline is not None
+
+    def cache_path(self, cache_dir):
+        key = f"{self.version[:16]}-{'-'.join(self.features)}-k{self.n_neighbors}"
+        if self.backend != 'auto':
+            key += f"-{self.backend}"
+        return os.path.join(cache_dir, f"food_index-{key}.joblib")
+
+    def save(self, path):
+        if not self.is_fitted:
+            raise RuntimeError("FoodIndex belum di-fit.")
+        self._compact(force=True)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump({
+            'version': self.version,
+            'features': self.features,
+            'n_neighbors': self.n_neighbors,
+            'backend': self.backend,
+            'pipeline': self.pipeline,
+        }, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, path):
+        """Memuat pipeline tersimpan. Mengembalikan False jika file tidak ada
+        atau dibuat dari versi dataset yang berbeda."""
+        if not os.path.exists(path):
+            return False
+        try:
+            state = joblib.load(path)
+        except Exception:
+            return False
+        if (state.get('version') != self.version
+                or state.get('features') != self.features
+                or state.get('n_neighbors') != self.n_neighbors
+                or state.get('backend', 'auto') != self.backend):
+            return False
+        self.pipeline = state['pipeline']
+        self._reset_incremental()
+        return True
+
+    def load_or_fit(self, cache_dir):
+        path = self.cache_path(cache_dir)
+        if not self.load(path):
+            self.fit()
+            try:
+                self.save(path)
+            except OSError:
+                # Folder cache tidak bisa ditulis: tetap jalan tanpa persistensi
+                pass
+        return self
+
+    def load_or_build_table(self, cache_dir, k=10):
+        """Memuat tabel tetangga dari cache, atau membangunnya sekali jika
+        ``nutrition.csv`` berubah (versi dataset berbeda)."""
+        path = NeighborTable.cache_path(cache_dir, self.version, k, self.backend)
+        table = NeighborTable.load(path, self.version)
+        if table is None:
+            table = NeighborTable.build(self, k=k)
+            try:
+                table.save(path)
+            except OSError:
+                pass
+        self.neighbor_table = table
+        return self
+
+    # =======================
+    # Query
+    # =======================
+    def transform(self, X):
+        X = pd.DataFrame(np.asarray(X, dtype=float).reshape(-1, len(self.features)),
+                         columns=self.features)
+        return self.pipeline.named_steps['scaler'].transform(
+            self.pipeline.named_steps['imputer'].transform(X)
+        )
+
+    @metrics.timed('kneighbors')
+    def kneighbors(self, X, n_neighbors=None):
+        n_neighbors = n_neighbors or self.n_neighbors
+        knn = self.pipeline.named_steps['knn']
+        Z = self.transform(X)
+        metrics.count('kneighbors_queries', len(Z))
+        if self._base_rows is None:
+            return knn.kneighbors(Z, n_neighbors=n_neighbors)
+
+        # Setelah pembaruan inkremental: hasil struktur KNN lama (tanpa baris
+        # yang sudah dihapus/diubah) digabung dengan brute force atas baris baru
+        dead = int((self._base_rows < 0).sum())
+        distances, indices = knn.kneighbors(Z, n_neighbors=min(n_neighbors + dead, len(self._base_rows)))
+        rows = self._base_rows[indices]
+        distances = np.where(rows < 0, np.inf, distances)
+        if len(self._delta_rows):
+            metrics.count('kneighbors_delta_rows_scanned', len(Z) * len(self._delta_rows))
+            delta = self._scaled[self._delta_rows]
+            squared = (Z ** 2).sum(axis=1)[:, None] + (delta ** 2).sum(axis=1)[None, :] - 2 * Z @ delta.T
+            distances = np.hstack([distances, np.sqrt(np.maximum(squared, 0.0))])
+            rows = np.hstack([rows, np.broadcast_to(self._delta_rows, squared.shape)])
+        order = np.argsort(distances, axis=1, kind='stable')[:, :n_neighbors]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+    def lookup(self, name):
+        """Posisi baris pertama dengan nama ``name`` (spasi ganda dan spasi
+        di tepi diabaikan), atau None."""
+        if self._name_positions is None:
+            positions = {}
+            for row, food in enumerate(self.df['name'].tolist()):
+                positions.setdefault(normalize_name(food), row)
+            self._name_positions = positions
+        return self._name_positions.get(normalize_name(name))
+
+    def query_vector(self, values, n_neighbors=None):
+        """Makanan terdekat dari satu vektor nutrisi, dengan kolom ``distance``."""
+        distances, indices = self.kneighbors([values], n_neighbors)
+        result = self.df.iloc[indices[0]].copy()
+        result['distance'] = distances[0]
+        return result
+
+    def query(self, name, n_neighbors=None):
+        """Makanan yang mirip dengan ``name`` (hasil pertama, yaitu makanan
+        itu sendiri, tidak disertakan). None jika nama tidak ditemukan.
+
+        Jika tabel tetangga sudah dimuat, hasil diambil langsung dari tabel.
+        """
+        n_neighbors = n_neighbors or self.n_neighbors
+        return self.result_cache.get_or_compute(
+            'query', [normalize_name(name), n_neighbors], lambda: self._query(name, n_neighbors))
+
+    def _query(self, name, n_neighbors):
+        row = self.lookup(name)
+        if row is None:
+            return None
+        table = self.neighbor_table
+        if table is not None and n_neighbors - 1 <= table.k:
+            rows, distances = table.neighbors(row, n_neighbors - 1)
+            result = self.df.iloc[rows].copy()
+            result['distance'] = distances
+            return result
+        values = self.df.loc[row, self.features].values.astype(float)
+        return self.query_vector(values, n_neighbors).iloc[1:]
+
+    # =======================
+    # Query per satu nutrisi
+    # =======================
+    def nutrient_index(self, column):
+        """Indeks terurut untuk satu kolom nutrisi, dibuat sekali lalu dipakai ulang."""
+        if column not in self._nutrient_indexes:
+            if column not in self.df.columns:
+                raise KeyError(f"Kolom nutrisi '{column}' tidak tersedia dalam dataset.")
+            self._nutrient_indexes[column] = NutrientIndex(self.df[column].values)
+        return self._nutrient_indexes[column]
+
+    def nearest_by_nutrient(self, column, value, k=5):
+        """k makanan dengan nilai ``column`` paling mendekati ``value``
+        (dibulatkan ke 0.01, di bawah presisi data katalog)."""
+        value = quantize(value, 0.01)
+
+        def compute():
+            rows, distances = self.nutrient_index(column).nearest(value, k)
+            result = self.df.iloc[rows].copy()
+            result['distance'] = distances
+            return result
+        return self.result_cache.get_or_compute('nutrient', [column, value, k], compute)
+
+    def nutrient_range(self, column, low=None, high=None):
+        """Makanan dengan nilai ``column`` di antara ``low`` dan ``high`` (inklusif)."""
+        return self.df.iloc[self.nutrient_index(column).range(low, high)]
+
+    # =======================
+    # Query dengan filter
+    # =======================
+    @property
+    def scaled(self):
+        """Vektor fitur terskala untuk semua baris, dihitung sekali."""
+        if self._scaled is None:
+            self._scaled = self.transform(self.df[self.features])
+        return self._scaled
+
+    def type_partitions(self):
+        """Partisi katalog per tipe makanan (lihat ``TypePartitions``), dibuat
+        sekali sehingga filter tipe dan planner tidak perlu operasi string."""
+        if self._type_partitions is None:
+            self._type_partitions = TypePartitions(self.df, self.features)
+        return self._type_partitions
+
+    def filter_mask(self, types=None, ranges=None):
+        """Mask boolean baris yang lolos filter.
+
+        ``types`` adalah daftar tipe makanan (tidak peka huruf besar/kecil) dan
+        ``ranges`` dict kolom -> (min, max), dengan None untuk batas terbuka,
+        mis. ``{'calories': (None, 300), 'proteins': (15, None)}``.
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+        if types is not None:
+            mask[:] = False
+            partitions = self.type_partitions()
+            for food_type in types:
+                mask[partitions.rows(str(food_type).strip().lower())] = True
+        for column, (low, high) in (ranges or {}).items():
+            in_range = np.zeros(len(self.df), dtype=bool)
+            in_range[self.nutrient_index(column).range(low, high)] = True
+            mask &= in_range
+        return mask
+
+    @staticmethod
+    def _quantize_vector(vector):
+        if vector is None:
+            return None
+        return [quantize(v, 0.01) for v in np.asarray(vector, dtype=float).tolist()]
+
+    @staticmethod
+    def _filter_key(types, ranges):
+        """``ranges`` dengan batas dibulatkan ke 0.01 dan bagian kunci cache
+        untuk ``types`` / ``ranges``. Filter harus memakai ``ranges`` hasil
+        fungsi ini agar sama dengan kuncinya."""
+        if ranges:
+            ranges = {column: tuple(quantize(v, 0.01) for v in bounds) for column, bounds in ranges.items()}
+        key = [None if types is None else sorted(str(t).strip().lower() for t in types),
+               sorted((column, list(bounds)) for column, bounds in ranges.items()) if ranges else None]
+        return ranges, key
+
+    def query_filtered(self, name=None, vector=None, n_neighbors=None, types=None, ranges=None):
+        """Makanan paling mirip dengan ``name`` (atau vektor nutrisi ``vector``)
+        di antara makanan yang lolos ``types`` / ``ranges``, dengan kolom
+        ``distance``. None jika ``name`` tidak ditemukan.
+
+        Jika kandidat sedikit, jarak dihitung langsung pada baris kandidat;
+        jika banyak, hasil indeks KNN utama diambil bertahap lalu disaring.
+        Tidak ada model yang di-fit ulang per kombinasi filter. Nilai
+        ``vector`` dan batas ``ranges`` dibulatkan ke 0.01.
+        """
+        vector = self._quantize_vector(vector)
+        ranges, filter_key = self._filter_key(types, ranges)
+        key = [None if name is None else normalize_name(name), vector, n_neighbors or self.n_neighbors, *filter_key]
+        return self.result_cache.get_or_compute(
+            'filtered', key, lambda: self._query_filtered(name, vector, n_neighbors, types, ranges))
+
+    def _query_filtered(self, name, vector, n_neighbors, types, ranges):
+        row = None
+        if name is not None:
+            row = self.lookup(name)
+            if row is None:
+                return None
+            vector = self.df.loc[row, self.features].to_numpy(dtype=float)
+        k = n_neighbors or self.n_neighbors
+        mask = self.filter_mask(types, ranges)
+        if row is not None:
+            mask[row] = False
+        candidates = np.flatnonzero(mask)
+        metrics.count('filtered_queries')
+
+        if len(candidates) <= max(4 * k, len(self.df) // 5):
+            metrics.count('filtered_rows_scanned', len(candidates))
+            diff = self.scaled[candidates] - self.transform([vector])[0]
+            distances = np.sqrt((diff ** 2).sum(axis=1))
+            top = min(k, len(candidates))
+            best = np.argpartition(distances, top - 1)[:top] if top < len(candidates) else np.arange(top)
+            best = best[np.lexsort((candidates[best], distances[best]))]
+            rows, distances = candidates[best], distances[best]
+        else:
+            fetch = 4 * k
+            while True:
+                distances, indices = self.kneighbors([vector], min(fetch, len(self.df)))
+                distances, indices = distances[0], indices[0]
+                metrics.count('filtered_rows_scanned', len(indices))
+                keep = (indices >= 0) & mask[np.maximum(indices, 0)]
+                if keep.sum() >= k or fetch >= len(self.df):
+                    break
+                fetch *= 4
+            rows, distances = indices[keep][:k], distances[keep][:k]
+        result = self.df.iloc[rows].copy()
+        result['distance'] = distances
+        return result
+
+    # =======================
+    # Kemiripan berbobot
+    # =======================
+    @property
+    def similarity(self):
+        """``SimilarityMatrix`` atas vektor terskala, dibuat sekali."""
+        if self._similarity is None:
+            self._similarity = SimilarityMatrix(self.scaled)
+        return self._similarity
+
+    def feature_weights(self, weights):
+        """Bobot per fitur sebagai array (dict fitur -> bobot, fitur lain 1)."""
+        if weights is None:
+            return None
+        if isinstance(weights, dict):
+            unknown = set(weights) - set(self.features)
+            if unknown:
+                raise ValueError(f"Fitur tidak dikenal: {', '.join(sorted(unknown))}.")
+            return np.array([float(weights.get(f, 1.0)) for f in self.features])
+        return np.asarray(weights, dtype=float)
+
+    def query_weighted(self, name=None, vector=None, n_neighbors=None, weights=None, metric='euclidean',
+                       types=None, ranges=None):
+        """Seperti ``query_filtered`` tetapi dengan bobot fitur per query
+        (mis. ``{'proteins': 3}``) dan metrik 'euclidean', 'cosine' atau
+        'mahalanobis' di atas ``similarity``; tidak ada yang di-fit ulang.
+        Kolom ``distance`` untuk cosine berisi 1 - kemiripan. Seperti di
+        ``query_filtered``, ``vector`` dan batas ``ranges`` dibulatkan ke 0.01.
+        """
+        weights = self.feature_weights(weights)
+        vector = self._quantize_vector(vector)
+        ranges, filter_key = self._filter_key(types, ranges)
+        key = [None if name is None else normalize_name(name), vector, n_neighbors or self.n_neighbors,
+               None if weights is None else [round(w, 6) for w in weights.tolist()], metric, *filter_key]
+        return self.result_cache.get_or_compute(
+            'weighted', key, lambda: self._query_weighted(name, vector, n_neighbors, weights, metric, types, ranges))
+
+    def _query_weighted(self, name, vector, n_neighbors, weights, metric, types, ranges):
+        exclude = None
+        if name is not None:
+            row = self.lookup(name)
+            if row is None:
+                return None
+            query = self.scaled[row]
+            exclude = [row]
+        else:
+            query = self.transform([vector])[0]
+        rows = None
+        if types is not None or ranges:
+            rows = np.flatnonzero(self.filter_mask(types, ranges))
+        metrics.count('weighted_queries')
+        metrics.count('weighted_rows_scanned', len(self.df) if rows is None else len(rows))
+        distances, positions = self.similarity.top_k(query, n_neighbors or self.n_neighbors, weights=weights,
+                                                     metric=metric, rows=rows, exclude=exclude)
+        result = self.df.iloc[positions[0]].copy()
+        result['distance'] = distances[0]
+        return result
+
+    # =======================
+    # Rencana makan
+    # =======================
+    def meal_plans(self, target, n_plans=3, step=10):
+        """``plan_meals`` untuk katalog ini dengan toleransi default. Target
+        kalori dibulatkan ke kelipatan ``step`` kkal sehingga kebutuhan yang
+        hampir sama memakai hasil yang sama dari cache."""
+        target = quantize(target, step)
+        return self.result_cache.get_or_compute(
+            'meal_plans', [target, n_plans],
+            lambda: plan_meals(self.df, target, n_plans=n_plans, partitions=self.type_partitions()))
+
+    # =======================
+    # Pencarian nama
+    # =======================
+    @property
+    def text_index(self):
+        if self._text_index is None:
+            self._text_index = TokenIndex(self.df['name'].tolist())
+        return self._text_index
+
+    def search_names(self, query, prefix=False, require_all=True, limit=None):
+        """Makanan yang namanya mengandung kata-kata di ``query``, terurut
+        berdasarkan relevansi."""
+        with metrics.span('search_names'):
+            rows = self.text_index.search(query, prefix=prefix, require_all=require_all, limit=limit)
+        return self.df.iloc[rows]
+
+    def suggest(self, prefix, limit=10):
+        """Saran nama makanan untuk autocomplete saat mengetik."""
+        rows = self.text_index.search(prefix, prefix=True, limit=limit * 2)
+        return list(dict.fromkeys(self.df['name'].values[rows]))[:limit]
+
+    def match_names(self, query, limit=5):
+        """Nama makanan paling mirip dengan ``query`` (toleran salah ketik dan
+        huruf besar/kecil), sebagai daftar (nama, skor)."""
+        if self._fuzzy_index is None:
+            self._fuzzy_index = TrigramIndex(self.df['name'].tolist())
+        return self._fuzzy_index.match(query, limit=limit)
+
+    # =======================
+    # Pembaruan inkremental
+    # =======================
+    def _reset_incremental(self):
+        # _scaled: vektor terskala semua baris df; _base_rows: posisi df untuk
+        # setiap titik di struktur KNN hasil fit (-1 = sudah dihapus/diubah);
+        # _delta_rows: baris baru/diubah yang dicari secara brute force
+        self._scaled = None
+        self._similarity = None
+        self._base_rows = None
+        self._delta_rows = None
+        self._stats = None
+
+    def _start_incremental(self):
+        if not self.is_fitted:
+            raise RuntimeError("FoodIndex belum di-fit.")
+        if self._base_rows is None:
+            self._scaled = self.scaled
+            self._base_rows = np.arange(len(self.df))
+            self._delta_rows = np.empty(0, dtype=np.int64)
+            self._stats = RunningStats.from_array(self.df[self.features].to_numpy(dtype=float))
+
+    def drift(self):
+        """Pergeseran terbesar mean/simpangan baku data sekarang terhadap
+        statistik scaler saat fit, dalam satuan simpangan baku (0 = sama)."""
+        if self._stats is None:
+            return 0.0
+        scaler = self.pipeline.named_steps['scaler']
+        mean_shift = np.abs(self._stats.mean - scaler.mean_) / scaler.scale_
+        scale_shift = np.abs(self._stats.std / scaler.scale_ - 1)
+        return float(max(mean_shift.max(), scale_shift.max()))
+
+    def add(self, records):
+        """Menambahkan makanan baru (dict, list of dict, atau DataFrame) tanpa fit ulang."""
+        new = pd.DataFrame([records] if isinstance(records, dict) else records)
+        self._start_incremental()
+        values = new.reindex(columns=self.features).to_numpy(dtype=float)
+        positions = np.arange(len(self.df), len(self.df) + len(new))
+        self.df = pd.concat([self.df, new], ignore_index=True)
+        if 'type' in self.df.columns:
+            self.df['type'] = normalize_types(self.df['type'].astype(object))
+        self._scaled = np.vstack([self._scaled, self.transform(values)])
+        self._delta_rows = np.concatenate([self._delta_rows, positions])
+        self._stats.add(values)
+        if self.neighbor_table is not None:
+            self.neighbor_table.append_rows(len(new))
+        return self._after_change(changed=positions)
+
+    def update(self, name, values):
+        """Mengubah kolom-kolom makanan ``name`` (dict kolom -> nilai baru)."""
+        row = self.lookup(name)
+        if row is None:
+            raise KeyError(f"Makanan '{name}' tidak ditemukan dalam dataset.")
+        self._start_incremental()
+        # copy=True: dengan copy-on-write pandas hasilnya bisa berupa view yang
+        # ikut berubah saat df.loc di bawah ditulis
+        old = self.df.loc[row, self.features].to_numpy(dtype=float, copy=True)
+        for column, value in values.items():
+            if column == 'type' and isinstance(self.df['type'].dtype, pd.CategoricalDtype):
+                value = str(value).strip().lower()
+                if value not in self.df['type'].cat.categories:
+                    self.df['type'] = self.df['type'].cat.add_categories([value])
+            self.df.loc[row, column] = value
+        new = self.df.loc[row, self.features].to_numpy(dtype=float)
+        if np.array_equal(old, new, equal_nan=True):
+            return self._after_change()
+
+        self._stats.remove(old[None, :])
+        self._stats.add(new[None, :])
+        self._scaled[row] = self.transform(new)[0]
+        self._base_rows[self._base_rows == row] = -1
+        if row not in self._delta_rows:
+            self._delta_rows = np.append(self._delta_rows, row)
+        stale = []
+        if self.neighbor_table is not None:
+            stale = np.flatnonzero((self.neighbor_table.indices == row).any(axis=1))
+        return self._after_change(changed=[row], stale=stale)
+
+    def delete(self, names):
+        """Menghapus semua baris dengan nama di ``names``."""
+        names = [names] if isinstance(names, str) else list(names)
+        positions = np.flatnonzero(self.df['name'].isin(names).to_numpy())
+        if not len(positions):
+            raise KeyError(f"Makanan {names} tidak ditemukan dalam dataset.")
+        self._start_incremental()
+        self._stats.remove(self.df[self.features].to_numpy(dtype=float)[positions])
+        self.df = self.df.drop(index=positions).reset_index(drop=True)
+        self._scaled = np.delete(self._scaled, positions, axis=0)
+
+        def shift(rows):
+            return rows - np.searchsorted(positions, rows)
+
+        dead = (self._base_rows < 0) | np.isin(self._base_rows, positions)
+        self._base_rows = np.where(dead, -1, shift(self._base_rows))
+        self._delta_rows = shift(self._delta_rows[~np.isin(self._delta_rows, positions)])
+        stale = []
+        if self.neighbor_table is not None:
+            stale = self.neighbor_table.remove_rows(positions)
+        return self._after_change(stale=stale)
+
+    def _after_change(self, changed=(), stale=()):
+        self._nutrient_indexes = {}
+        self._name_positions = None
+        self._text_index = None
+        self._fuzzy_index = None
+        self._type_partitions = None
+        self._similarity = None
+        self.version = dataset_hash(self.df, self.features)
+        self.result_cache.set_version(self.cache_version)
+        table = self.neighbor_table
+
+        if self.drift() > self.drift_threshold:
+            # Statistik scaler sudah tidak mewakili data: fit ulang penuh
+            self.fit()
+            if table is not None:
+                self.neighbor_table = NeighborTable.build(self, k=table.k)
+            return self
+
+        self._compact()
+        if table is not None:
+            changed = np.asarray(changed, dtype=np.int64)
+            affected = [changed, np.asarray(stale, dtype=np.int64)]
+            if len(changed):
+                affected.append(self._rows_within(self._scaled[changed], table.distances[:, -1]))
+            table.refresh(self, np.unique(np.concatenate(affected)))
+        return self
+
+    def _rows_within(self, vectors, radii, chunk_size=65536):
+        """Baris yang jaraknya ke salah satu ``vectors`` lebih kecil dari
+        jarak tetangga ke-K miliknya, yaitu baris yang daftar tetangganya berubah."""
+        hits = []
+        for start in range(0, len(self._scaled), chunk_size):
+            Z = self._scaled[start:start + chunk_size]
+            squared = ((Z[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+            hits.append(start + np.flatnonzero(squared < radii[start:start + chunk_size].astype(float) ** 2))
+        return np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+
+    def _compact(self, force=False):
+        """Fit ulang hanya langkah NearestNeighbors (scaler tetap) jika baris
+        brute force / baris mati sudah terlalu banyak."""
+        if self._base_rows is None:
+            return
+        pending = len(self._delta_rows) + int((self._base_rows < 0).sum())
+        if pending and (force or pending > max(256, len(self.df) // 20)):
+            self.pipeline.named_steps['knn'].fit(self._scaled)
+            self._base_rows = np.arange(len(self.df))
+            self._delta_rows = np.empty(0, dtype=np.int64)
@@ -0,0 +1,215 @@
+"""Ingest bertahap dataset komposisi makanan berukuran besar.
+
+File CSV atau Parquet dibaca per blok, setiap blok divalidasi (skema,
+rentang nilai, konsistensi kalori dengan makro), baris yang nyaris sama
+dibuang berdasarkan nama yang dinormalisasi, lalu baris yang lolos
+langsung ditulis ke katalog kolomar lewat ``CatalogWriter``. Pemeriksaan
+kewajaran (rentang dan Atwater) secara bawaan hanya menjadi peringatan,
+karena tabel komposisi pangan asli pun memuat nilai yang gagal di sana;
+``strict=True`` menolak baris tersebut. Memori yang
+dipakai sebatas satu blok ditambah 8 byte per baris unik (hash untuk
+deteksi duplikat), berapa pun ukuran file masukannya.
+"""
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .catalog import CatalogWriter
+from .data import FEATURES
+from .result_cache import normalize_name
+
+# Kalori per gram makro (faktor Atwater umum)
+ATWATER = {'proteins': 4.0, 'fat': 9.0, 'carbohydrate': 4.0}
+
+# Batas nilai per 100 g: lemak murni sekitar 900 kkal, makro tidak lebih dari 100 g
+MAX_CALORIES = 950.0
+MAX_MACRO_GRAMS = 100.0
+MAX_MACRO_TOTAL = 105.0
+
+# Alasan penolakan baris, sesuai urutan pemeriksaan
+REASONS = ('kosong', 'bukan_angka', 'negatif', 'di_luar_rentang', 'atwater', 'duplikat')
+# Alasan yang hanya menjadi peringatan kecuali ingest(strict=True)
+PLAUSIBILITY = ('di_luar_rentang', 'atwater')
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def name_key(name):
+    """Kunci nama untuk deteksi duplikat: huruf kecil tanpa aksen, tanda
+    baca dan spasi ganda ('Tempe  Goreng!' dan 'tempe goreng' sama)."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(_NON_WORD.sub(' ', text.lower()).split())
+
+
+def _blank(column):
+    if pd.api.types.is_numeric_dtype(column):
+        return column.isna()
+    return column.isna() | (column.astype(str).str.strip() == '')
+
+
+def validate_chunk(chunk, features=FEATURES, atwater_tolerance=0.6, atwater_min_kcal=60.0):
+    """Memeriksa satu blok (semua kolom teks) dan mengembalikan
+    ``(nilai_numerik, alasan)``.
+
+    ``alasan`` berisi kode dari ``REASONS`` untuk baris yang ditolak dan
+    ``None`` untuk baris yang lolos. Kalori dianggap tidak konsisten jika
+    selisihnya dengan 4*protein + 9*lemak + 4*karbohidrat melebihi
+    ``atwater_tolerance`` x nilai terbesar keduanya dan ``atwater_min_kcal``
+    (serat, alkohol dan pembulatan tabel membuat selisih kecil wajar).
+    ``atwater_tolerance=None`` mematikan pemeriksaan ini.
+    """
+    raw = chunk[list(features)]
+    values = raw.apply(pd.to_numeric, errors='coerce')
+    names = chunk['name']
+    reason = np.full(len(chunk), None, dtype=object)
+
+    def reject(mask, code):
+        reason[np.asarray(mask) & pd.isna(reason)] = code
+
+    reject(raw.apply(_blank).any(axis=1).to_numpy() | _blank(names).to_numpy(), 'kosong')
+    reject(values.isna().any(axis=1).to_numpy() | ~np.isfinite(values.to_numpy()).all(axis=1), 'bukan_angka')
+    reject((values < 0).any(axis=1).to_numpy(), 'negatif')
+
+    macros = [column for column in ATWATER if column in values.columns]
+    out_of_range = np.zeros(len(chunk), dtype=bool)
+    if 'calories' in values.columns:
+        out_of_range |= (values['calories'] > MAX_CALORIES).to_numpy()
+    if macros:
+        out_of_range |= (values[macros] > MAX_MACRO_GRAMS).any(axis=1).to_numpy()
+        out_of_range |= (values[macros].sum(axis=1) > MAX_MACRO_TOTAL).to_numpy()
+    reject(out_of_range, 'di_luar_rentang')
+
+    if atwater_tolerance is not None and 'calories' in values.columns and len(macros) == len(ATWATER):
+        calories = values['calories'].to_numpy()
+        estimate = sum(values[column].to_numpy() * factor for column, factor in ATWATER.items())
+        limit = np.maximum(atwater_min_kcal, atwater_tolerance * np.maximum(calories, estimate))
+        reject(np.abs(calories - estimate) > limit, 'atwater')
+    return values, pd.Series(reason, index=chunk.index, dtype=object)
+
+
+class _SeenRows:
+    """Hash 64-bit baris yang sudah ditulis (8 byte per baris unik).
+
+    Hash disimpan sebagai beberapa array terurut dengan ukuran kira-kira
+    berlipat dua; array baru digabung dengan pendahulunya yang tidak lebih
+    besar. Jumlah array tetap logaritmik, dan array besar tidak dialokasi
+    ulang di setiap blok sehingga memori tidak membengkak karena
+    fragmentasi.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def mark_new(self, hashes):
+        """True untuk hash yang belum pernah dilihat (termasuk di dalam blok ini)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first = np.unique(hashes, return_index=True)
+        fresh = np.ones(len(unique), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, unique).clip(max=len(run) - 1)
+            fresh &= run[positions] != unique
+        new = np.zeros(len(hashes), dtype=bool)
+        new[first[fresh]] = True
+        if fresh.any():
+            self.runs.append(unique[fresh])
+            while len(self.runs) > 1 and len(self.runs[-1]) >= len(self.runs[-2]):
+                last = self.runs.pop()
+                self.runs[-1] = np.sort(np.concatenate([self.runs[-1], last]))
+        return new
+
+
+def _row_hashes(names, values, decimals):
+    keys = pd.DataFrame({'name': [name_key(name) for name in names.tolist()]}, index=values.index)
+    keys = keys.join(values.round(decimals))
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def iter_chunks(path, chunksize=100_000):
+    """Blok DataFrame dari CSV (semua kolom teks), atau Parquet jika
+    ekstensinya .parquet. Kolom tanpa nama (koma di akhir baris) dibuang."""
+    if str(path).endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        batches = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+    else:
+        batches = pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False, na_values=[''])
+    for chunk in batches:
+        yield chunk.loc[:, [c for c in chunk.columns if not str(c).startswith('Unnamed:')]]
+
+
+@metrics.timed('ingest')
+def ingest(path, out_path, chunksize=100_000, features=FEATURES, rejects_path=None, dedupe_decimals=1,
+           atwater_tolerance=0.6, atwater_min_kcal=60.0, strict=False):
+    """Ingest ``path`` ke katalog kolomar ``out_path`` secara bertahap.
+
+    Baris yang lolos validasi ditulis dengan nama yang dirapikan (spasi
+    ganda dibuang) dan nilai nutrisi numerik; duplikat adalah baris dengan
+    ``name_key`` dan nilai nutrisi (dibulatkan ke ``dedupe_decimals``) yang
+    sama dengan baris sebelumnya. Baris yang ditolak beserta kolom
+    ``alasan`` ditulis ke ``rejects_path`` (CSV) jika diberikan.
+
+    Baris yang gagal pemeriksaan kewajaran (``PLAUSIBILITY``) tetap ditulis
+    dan hanya dihitung sebagai peringatan, kecuali jika ``strict=True``.
+
+    Mengembalikan ``(catalog, laporan)``; laporan berisi jumlah baris
+    dibaca, ditulis, ditolak per alasan dan peringatan per alasan.
+    """
+    writer = None
+    seen = _SeenRows()
+    rejects_header = True
+    report = {'rows_read': 0, 'rows_written': 0, 'chunks': 0, 'rejected': dict.fromkeys(REASONS, 0),
+              'warnings': dict.fromkeys(PLAUSIBILITY, 0)}
+    try:
+        for chunk in iter_chunks(path, chunksize):
+            if writer is None:
+                missing = [c for c in ['name'] + list(features) if c not in chunk.columns]
+                if missing:
+                    raise ValueError(f"Kolom wajib tidak ditemukan di '{path}': {', '.join(missing)}.")
+                columns = list(chunk.columns)
+                strings = [c for c in columns if c not in features]
+                writer = CatalogWriter(out_path, list(features), strings, columns=columns)
+            chunk = chunk.reindex(columns=columns)
+
+            values, reason = validate_chunk(chunk, features, atwater_tolerance, atwater_min_kcal)
+            if not strict:
+                warned = reason.isin(PLAUSIBILITY)
+                for code, n in reason[warned].value_counts().items():
+                    report['warnings'][code] += int(n)
+                    metrics.count(f"ingest_warning_{code}", int(n))
+                reason[warned] = None
+            valid = reason.isna().to_numpy()
+            new = np.zeros(len(chunk), dtype=bool)
+            new[valid] = seen.mark_new(_row_hashes(chunk['name'][valid], values[valid], dedupe_decimals))
+            reason[valid & ~new] = 'duplikat'
+
+            accepted = chunk[new].assign(**{column: values.loc[new, column] for column in features})
+            accepted['name'] = accepted['name'].map(normalize_name)
+            writer.append(accepted)
+
+            counts = reason.value_counts()
+            for code, n in counts.items():
+                report['rejected'][code] += int(n)
+                metrics.count(f"ingest_rejected_{code}", int(n))
+            if rejects_path and len(counts):
+                chunk[~new].assign(alasan=reason[~new]).to_csv(
+                    rejects_path, mode='w' if rejects_header else 'a', header=rejects_header, index=False)
+                rejects_header = False
+            report['rows_read'] += len(chunk)
+            report['rows_written'] += int(new.sum())
+            report['chunks'] += 1
+            metrics.count('ingest_rows_read', len(chunk))
+            metrics.count('ingest_rows_written', int(new.sum()))
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is None:
+        raise ValueError(f"File '{path}' kosong.")
+    return writer.close(source={'path': os.path.abspath(path), 'ingest': report}), report
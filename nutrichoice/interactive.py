@@ -0,0 +1,52 @@
+"""Helper menu interaktif terminal, dipakai bersama oleh skrip CLI lama
+(``sistem_rekomendasi_makanan.py`` dan ``src/sistem_rekomendasi_makanan.py``)."""
+import math
+import re
+
+_NUMBER = r'[-+]?(?:\d+(?:\.\d*)?|\.\d+)'
+_RANGE = re.compile(rf'^\s*({_NUMBER})\s*-\s*({_NUMBER})\s*$')
+
+
+def resolve_food_name(index, user_input, prompt=input):
+    """Nama persis di dataset untuk ``user_input`` (ejaan di dataset, termasuk
+    spasi gandanya). Jika tidak ada yang sama, tawarkan kandidat terdekat
+    (toleran salah ketik) untuk dipilih."""
+    row = index.lookup(user_input)
+    if row is not None:
+        return index.df['name'].iat[row]
+
+    candidates = index.match_names(user_input, limit=5)
+    if not candidates:
+        return None
+    if candidates[0][1] == 1.0:
+        # Hanya beda huruf besar/kecil atau spasi
+        return candidates[0][0]
+
+    print("Mungkin yang Anda maksud:")
+    for i, (name, _) in enumerate(candidates, 1):
+        print(f"{i}. {name}")
+    choice = prompt(f"Pilih nomor (1-{len(candidates)}) atau Enter untuk batal: ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return candidates[int(choice) - 1][0]
+    return None
+
+
+def print_recommendations(recommendations):
+    for _, row in recommendations.iterrows():
+        print(f"- {row['name']}: {row['calories']} kkal, Protein: {row['proteins']}g, Lemak: {row['fat']}g, Karbo: {row['carbohydrate']}g")
+        print(f"  Gambar: {row['image']}")
+
+
+def parse_amount(text):
+    """Satu angka, atau rentang 'min-max' sebagai tuple (min, max).
+
+    Tanda minus di depan angka bukan pemisah rentang: '-5' adalah satu angka
+    dan '-5 - 10' rentang -5 sampai 10. ValueError jika bukan angka (termasuk nan/inf).
+    """
+    match = _RANGE.match(text)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(f"Bukan angka: '{text}'.")
+    return value
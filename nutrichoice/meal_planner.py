@@ -0,0 +1,276 @@
+from collections import namedtuple
+
+import numpy as np
+
+from . import metrics
+from .partitions import TypePartitions
+
+# Susunan menu: setiap waktu makan terdiri dari beberapa slot, dan setiap
+# slot diisi satu makanan dari salah satu kategori (kolom ``type``)
+MEAL_SLOTS = {
+    'sarapan': [('karbo',), ('lauk',), ('buah', 'minuman')],
+    'siang': [('lauk',), ('sayuran masak',), ('karbo',)],
+    'malam': [('buah',), ('camilan',), ('minuman',)],
+}
+
+# Porsi kalori harian untuk tiap waktu makan
+MEAL_SHARES = {'sarapan': 0.35, 'siang': 0.35, 'malam': 0.30}
+
+# Batas jumlah pasangan dua slot yang boleh dimaterialisasi sekaligus
+PAIR_LIMIT = 1 << 20
+
+MealPlan = namedtuple('MealPlan', ['deviation', 'total', 'meals', 'meal_calories'])
+
+
+def default_tolerances(target):
+    """Toleransi total dan per waktu makan seperti yang dipakai aplikasi."""
+    total_tolerance = max(200, target * 0.1)
+    meal_tolerance = max(150, MEAL_SHARES['sarapan'] * target * 0.15)
+    return total_tolerance, meal_tolerance
+
+
+class _Slot:
+    """Kandidat satu slot menu, diurutkan menurut kalori (dalam satuan
+    ``resolution``) dan dikelompokkan per nilai kalori."""
+
+    def __init__(self, rows, units):
+        order = np.argsort(units, kind='stable')
+        self.rows = np.asarray(rows)[order]
+        self.units = np.asarray(units, dtype=np.int64)[order]
+        self.values, self.starts, self.counts = np.unique(self.units, return_index=True, return_counts=True)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def span(self):
+        return int(self.values[-1] - self.values[0]) + 1 if len(self.values) else 0
+
+    def histogram(self):
+        """Jumlah baris per nilai kalori, mulai dari ``values[0]``."""
+        histogram = np.zeros(self.span)
+        histogram[self.values - self.values[0]] = self.counts
+        return histogram
+
+    def find(self, values):
+        """Indeks nilai unik untuk setiap ``values`` (bisect), -1 jika tidak ada."""
+        positions = np.searchsorted(self.values, values).clip(max=len(self.values) - 1)
+        return np.where(self.values[positions] == values, positions, -1)
+
+    def group(self, i):
+        return self.rows[self.starts[i]:self.starts[i] + self.counts[i]]
+
+
+def _pair_histogram(first, second):
+    """Histogram jumlah kalori semua pasangan dua slot, mulai dari nilai
+    terkecil. Jumlah pasangan dimaterialisasi (lalu di-bincount) hanya jika
+    lebih murah daripada konvolusi histogram rapat kedua slot, dan tidak
+    pernah lebih dari ``PAIR_LIMIT``."""
+    if len(first) * len(second) <= min(first.span * second.span, PAIR_LIMIT):
+        sums = (first.units[:, None] + second.units[None, :]).ravel()
+        lowest = first.values[0] + second.values[0]
+        return np.bincount(sums - lowest).astype(float)
+    return np.convolve(first.histogram(), second.histogram())
+
+
+def _ragged_arange(starts, lengths):
+    """Gabungan arange(start, start + length) untuk setiap pasangan."""
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(int(np.sum(lengths))) - offsets + np.repeat(starts, lengths)
+
+
+class _MealCombos:
+    """Kombinasi satu waktu makan (satu makanan per slot) yang masuk
+    toleransi, dikelompokkan per jumlah kalori (dalam satuan ``resolution``).
+
+    Kombinasi tidak pernah dimaterialisasi seluruhnya: histogram jumlah
+    kalori dihitung dari histogram pasangan dua slot pertama dan histogram
+    slot ketiga (memori sebanding rentang kalori, bukan hasil kali ukuran
+    slot). Anggota kombinasi diurai saat diminta (``members``) dengan
+    bisect pada nilai kalori slot kedua, atau diambil maksimal ``limit``
+    sekaligus (``take``).
+    """
+
+    def __init__(self, slot_rows, slot_units, target_units, tolerance_units):
+        self.slots = [_Slot(rows, units) for rows, units in zip(slot_rows, slot_units)]
+        self.shape = tuple(len(slot) for slot in self.slots)
+        self.low, self.high = target_units - tolerance_units, target_units + tolerance_units
+        metrics.count('meal_combinations_evaluated', int(np.prod(self.shape)))
+
+        self.histogram = np.zeros(0)
+        self.lowest = self.low
+        if all(len(slot) for slot in self.slots):
+            first, second, third = self.slots
+            pairs = _pair_histogram(first, second)
+            pairs_lowest = int(first.values[0] + second.values[0])
+            window = np.zeros(self.high - self.low + 1)
+            # Jumlah kombinasi per total = sum_c n_c * pasangan[total - c]
+            for value, count in zip(third.values.tolist(), third.counts.tolist()):
+                start = self.low - value - pairs_lowest
+                stop = start + len(window)
+                lo, hi = max(start, 0), min(stop, len(pairs))
+                if lo < hi:
+                    window[lo - start:hi - start] += count * pairs[lo:hi]
+            nonzero = np.flatnonzero(window)
+            if len(nonzero):
+                self.lowest = self.low + int(nonzero[0])
+                self.histogram = window[nonzero[0]:nonzero[-1] + 1]
+        self.values = self.lowest + np.flatnonzero(self.histogram)
+        self.counts = self.histogram[self.values - self.lowest]
+        self.total = int(self.counts.sum())
+        metrics.count('meal_combinations_in_tolerance', self.total)
+
+    def __len__(self):
+        return self.total
+
+    def count(self, values):
+        offsets = np.asarray(values) - self.lowest
+        inside = (offsets >= 0) & (offsets < len(self.histogram))
+        result = np.zeros(offsets.shape)
+        result[inside] = self.histogram[offsets[inside]]
+        return result
+
+    def _value_triples(self, value):
+        # Indeks nilai unik (slot 1, slot 2, slot 3) dengan jumlah = value
+        first, second, third = self.slots
+        for k, c in enumerate(third.values.tolist()):
+            j = second.find(value - c - first.values)
+            found = np.flatnonzero(j >= 0)
+            for i in found.tolist():
+                yield i, int(j[i]), k
+
+    def members(self, value):
+        """Kombinasi (baris per slot) dengan total kalori ``value``, diurai
+        satu per satu."""
+        first, second, third = self.slots
+        for i, j, k in self._value_triples(value):
+            for a in first.group(i).tolist():
+                for b in second.group(j).tolist():
+                    for c in third.group(k).tolist():
+                        yield [a, b, c]
+
+    def _value_pairs(self):
+        # Pasangan nilai unik slot 1 & 2 yang masih bisa masuk toleransi,
+        # terurut menurut jumlahnya (ukurannya dibatasi rentang kalori)
+        first, second, third = self.slots
+        low = self.low - third.values[-1] - first.values
+        high = self.high - third.values[0] - first.values
+        start, stop = np.searchsorted(second.values, low), np.searchsorted(second.values, high, side='right')
+        i = np.repeat(np.arange(len(first.values)), stop - start)
+        j = _ragged_arange(start, stop - start)
+        sums = first.values[i] + second.values[j]
+        order = np.argsort(sums, kind='stable')
+        return i[order], j[order], sums[order]
+
+    def take(self, limit):
+        """Maksimal ``limit`` kombinasi sebagai array (n, slot), mulai dari
+        total kalori yang paling dekat ke target. Pasangan nilai slot 1 & 2
+        disimpan terurut dan slot 3 dicari dengan bisect per total."""
+        if not self.total:
+            return np.empty((0, len(self.slots)), dtype=np.int64)
+        first, second, third = self.slots
+        pair_i, pair_j, pair_sums = self._value_pairs()
+        target = (self.low + self.high) / 2
+        chunks, taken = [], 0
+        for value in self.values[np.argsort(np.abs(self.values - target), kind='stable')].tolist():
+            start = np.searchsorted(pair_sums, value - third.values)
+            stop = np.searchsorted(pair_sums, value - third.values, side='right')
+            lengths = stop - start
+            k = np.repeat(np.arange(len(third.values)), lengths)
+            p = _ragged_arange(start, lengths)
+            i, j = pair_i[p], pair_j[p]
+            n1, n2, n3 = first.counts[i], second.counts[j], third.counts[k]
+            sizes = n1 * n2 * n3
+            ends = np.cumsum(sizes)
+            g = np.arange(min(int(ends[-1]), limit - taken)) if len(ends) else np.empty(0, dtype=np.int64)
+            t = np.searchsorted(ends, g, side='right')
+            local = g - (ends[t] - sizes[t])
+            a, rest = np.divmod(local, n2[t] * n3[t])
+            b, c = np.divmod(rest, n3[t])
+            chunks.append(np.stack([first.rows[first.starts[i[t]] + a], second.rows[second.starts[j[t]] + b],
+                                    third.rows[third.starts[k[t]] + c]], axis=1))
+            taken += len(g)
+            if taken >= limit:
+                break
+        return np.concatenate(chunks)
+
+
+def _slot_candidates(partitions, categories, resolution):
+    rows, calories = partitions.select(categories, 'calories')
+    return rows, np.rint(calories / resolution).astype(np.int64)
+
+
+@metrics.timed('plan_meals')
+def plan_meals(df, target, n_plans=3, total_tolerance=None, meal_tolerance=None,
+               resolution=0.1, meal_slots=MEAL_SLOTS, meal_shares=MEAL_SHARES, partitions=None):
+    """Mencari ``n_plans`` rencana makan harian dengan total kalori paling
+    dekat ke ``target`` dari seluruh katalog.
+
+    Setiap waktu makan harus berada dalam ``meal_tolerance`` dari porsinya
+    dan total harian dalam ``total_tolerance``. Kalori dibulatkan ke
+    ``resolution`` kkal (data katalog berpresisi 0.1 kkal, sehingga hasilnya
+    eksak). Susunan menu terdiri dari tiga waktu makan. Distribusi total
+    dihitung dengan konvolusi histogram kalori tiap waktu makan, lalu
+    kombinasi hanya diurai untuk nilai total terdekat.
+
+    ``partitions`` (``TypePartitions`` milik ``df``, mis. dari
+    ``FoodIndex.type_partitions()``) dipakai ulang jika diberikan.
+    """
+    if partitions is None:
+        partitions = TypePartitions(df, columns=['calories'])
+    if total_tolerance is None or meal_tolerance is None:
+        default_total, default_meal = default_tolerances(target)
+        total_tolerance = default_total if total_tolerance is None else total_tolerance
+        meal_tolerance = default_meal if meal_tolerance is None else meal_tolerance
+
+    meal_names = list(meal_slots)
+    meal_targets = [int(round(meal_shares[m] * target / resolution)) for m in meal_names]
+    tolerance_units = int(np.floor(meal_tolerance / resolution))
+
+    combos = []
+    for meal, meal_target in zip(meal_names, meal_targets):
+        candidates = [_slot_candidates(partitions, categories, resolution) for categories in meal_slots[meal]]
+        combos.append(_MealCombos(
+            [rows for rows, _ in candidates], [units for _, units in candidates],
+            meal_target, tolerance_units,
+        ))
+    if any(len(c) == 0 for c in combos):
+        return []
+
+    # Distribusi jumlah kombinasi untuk setiap total kalori
+    distribution = combos[0].histogram
+    for meal_combos in combos[1:]:
+        distribution = np.convolve(distribution, meal_combos.histogram)
+    lowest_total = sum(c.lowest for c in combos)
+    totals = lowest_total + np.flatnonzero(distribution)
+    deviations = np.abs(totals * resolution - target)
+    keep = deviations <= total_tolerance
+    totals, deviations = totals[keep], deviations[keep]
+    metrics.count('meal_plan_totals_in_tolerance', len(totals))
+
+    plans = []
+    first, second, third = combos
+    for total in totals[np.lexsort((totals, deviations))]:
+        # Utamakan waktu makan yang paling dekat dengan porsinya masing-masing
+        for v1 in first.values[np.argsort(np.abs(first.values - meal_targets[0]), kind='stable')]:
+            v2 = second.values
+            v3 = total - v1 - v2
+            valid = third.count(v3) > 0
+            if not valid.any():
+                continue
+            v2, v3 = v2[valid], v3[valid]
+            for j in np.argsort(np.abs(v2 - meal_targets[1]), kind='stable'):
+                for c1 in first.members(v1):
+                    for c2 in second.members(v2[j]):
+                        for c3 in third.members(v3[j]):
+                            values = (int(v1), int(v2[j]), int(v3[j]))
+                            plans.append(MealPlan(
+                                deviation=float(abs(total * resolution - target)),
+                                total=float(total * resolution),
+                                meals=dict(zip(meal_names, (c1, c2, c3))),
+                                meal_calories={meal: v * resolution for meal, v
+                                               in zip(meal_names, values)},
+                            ))
+                            if len(plans) >= n_plans:
+                                return plans
+    return plans
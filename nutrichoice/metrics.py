@@ -0,0 +1,189 @@
+"""Instrumentasi ringan: timer/span per tahap, counter, dan profiler opsional.
+
+    with metrics.span('plan_meals'):
+        ...
+        metrics.count('meal_plan_combinations', len(combos))
+
+Semua nilai dikumpulkan di ``REGISTRY`` (thread-safe) dan dapat dibaca
+sebagai dict/JSON (``snapshot``) atau format teks Prometheus
+(``prometheus_text``). Span yang bersarang dicatat dengan nama lengkap
+(``induk/anak``) sehingga waktu sebuah tahap dapat dipecah ke sub-tahapnya.
+``NUTRICHOICE_METRICS=0`` mematikan pencatatan.
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Batas atas bucket histogram durasi (detik), seperti default klien Prometheus
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current_span = contextvars.ContextVar('nutrichoice_span', default=None)
+
+
+class _Timer:
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """Kumpulan timer dan counter bernama, plus ``recent`` span terakhir."""
+
+    def __init__(self, enabled=True, recent=200):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+        self._recent = deque(maxlen=recent)
+        self._profiler = None
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._recent.clear()
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = _Timer()
+            timer.observe(seconds)
+            self._recent.append((name, seconds, time.time()))
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, name):
+        """Mengukur durasi blok ``with``; nama diberi awalan span induknya."""
+        if not self.enabled:
+            yield
+            return
+        parent = _current_span.get()
+        full_name = f"{parent}/{name}" if parent else name
+        token = _current_span.set(full_name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(full_name, time.perf_counter() - start)
+            _current_span.reset(token)
+
+    def timed(self, name=None):
+        """Dekorator: setiap panggilan fungsi dicatat sebagai span ``name``."""
+        def decorator(fn):
+            label = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # =======================
+    # Profiler (cProfile)
+    # =======================
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def start_profiling(self):
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profiling(self, sort='cumulative', limit=30):
+        """Menghentikan profiler dan mengembalikan ringkasan pstats sebagai teks."""
+        if self._profiler is None:
+            return ''
+        profiler, self._profiler = self._profiler, None
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    # =======================
+    # Ekspor
+    # =======================
+    def snapshot(self):
+        with self._lock:
+            timers = {
+                name: {
+                    'count': t.count,
+                    'total_ms': round(t.total * 1000, 3),
+                    'mean_ms': round(t.total * 1000 / t.count, 3) if t.count else 0.0,
+                    'max_ms': round(t.max * 1000, 3),
+                }
+                for name, t in sorted(self._timers.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+            recent = [{'span': name, 'ms': round(seconds * 1000, 3), 'at': at}
+                      for name, seconds, at in self._recent]
+        return {'timers': timers, 'counters': counters, 'recent': recent}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def prometheus_text(self, prefix='nutrichoice'):
+        """Format eksposisi teks Prometheus: histogram durasi per span dan
+        counter per nama (karakter selain alfanumerik menjadi ``_``)."""
+        lines = [f"# HELP {prefix}_span_seconds Durasi tahap (span).",
+                 f"# TYPE {prefix}_span_seconds histogram"]
+        with self._lock:
+            timers = sorted(self._timers.items())
+            counters = sorted(self._counters.items())
+        for name, t in timers:
+            cumulative = 0
+            for bound, n in zip(BUCKETS, t.buckets):
+                cumulative += n
+                lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="+Inf"}} {t.count}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {t.total:.6f}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {t.count}')
+        for name, value in counters:
+            metric = f"{prefix}_{''.join(c if c.isalnum() else '_' for c in name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Menyimpan ke ``path``: teks Prometheus untuk .prom/.txt, selain itu JSON."""
+        text = self.prometheus_text() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get('NUTRICHOICE_METRICS', '1') != '0')
+
+span = REGISTRY.span
+count = REGISTRY.count
+timed = REGISTRY.timed
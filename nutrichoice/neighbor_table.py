@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from . import metrics
+from .batch import kneighbors_chunked
+
+
+def _without_self(rows, distances, indices):
+    """Membuang baris itu sendiri dari hasil kneighbors k+1; jika tidak muncul
+    (duplikat), kolom terakhir yang dibuang."""
+    n, k = len(rows), indices.shape[1] - 1
+    is_self = indices == rows[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    keep = ~is_self
+    return indices[keep].reshape(n, k).astype(np.int32), distances[keep].reshape(n, k).astype(np.float32)
+
+
+class NeighborTable:
+    """Tabel tetangga terdekat yang sudah dihitung untuk setiap makanan.
+
+    ``indices[i]`` berisi posisi K makanan paling mirip dengan baris ``i``
+    (tanpa baris itu sendiri) dan ``distances[i]`` jaraknya, disimpan
+    sebagai file .npy int32/float32 yang dimuat dengan memory map
+    (copy-on-write: ``refresh`` hanya mengubah salinan halaman di memori
+    proses, file di disk tetap utuh dan halamannya dipakai bersama).
+    """
+
+    def __init__(self, indices, distances, version):
+        self.indices = indices
+        self.distances = distances
+        self.version = version
+
+    @property
+    def k(self):
+        return self.indices.shape[1]
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    @classmethod
+    @metrics.timed('neighbor_table_build')
+    def build(cls, index, k=10, chunk_size=4096, n_jobs=1):
+        n = len(index.df)
+        k = min(k, n - 1)
+        X = index.df[index.features].to_numpy(dtype=float)
+        distances, indices = kneighbors_chunked(index, X, k + 1, chunk_size, n_jobs)
+        return cls(*_without_self(np.arange(n), distances, indices), index.version)
+
+    def refresh(self, index, rows, chunk_size=4096):
+        """Menghitung ulang daftar tetangga hanya untuk ``rows``."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows):
+            X = index.df[index.features].to_numpy(dtype=float)[rows]
+            distances, indices = kneighbors_chunked(index, X, self.k + 1, chunk_size)
+            self.indices[rows], self.distances[rows] = _without_self(rows, distances, indices)
+        self.version = index.version
+        return self
+
+    def append_rows(self, count):
+        """Menambah ``count`` baris kosong (diisi kemudian oleh ``refresh``)."""
+        self.indices = np.vstack([self.indices, np.zeros((count, self.k), dtype=np.int32)])
+        self.distances = np.vstack([self.distances, np.full((count, self.k), np.inf, dtype=np.float32)])
+
+    def remove_rows(self, positions):
+        """Membuang baris ``positions`` (terurut) dan menggeser posisi sisanya.
+        Mengembalikan baris yang daftar tetangganya memuat baris yang dibuang
+        sehingga perlu di-``refresh``."""
+        keep = np.ones(len(self), dtype=bool)
+        keep[positions] = False
+        indices = self.indices[keep]
+        stale = np.flatnonzero(np.isin(indices, positions).any(axis=1))
+        self.indices = (indices - np.searchsorted(positions, indices)).astype(np.int32)
+        self.distances = self.distances[keep]
+        return stale
+
+    def neighbors(self, row, k=None):
+        k = self.k if k is None else k
+        return self.indices[row, :k], self.distances[row, :k]
+
+    @staticmethod
+    def cache_path(cache_dir, version, k, backend='auto'):
+        suffix = '' if backend == 'auto' else f"-{backend}"
+        return os.path.join(cache_dir, f"neighbors-{version[:16]}-k{k}{suffix}")
+
+    def save(self, path):
+        """Menyimpan ke folder ``path`` (indices.npy, distances.npy, meta.json);
+        ditulis di folder sementara lalu dipindahkan."""
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'indices.npy'), np.ascontiguousarray(self.indices, dtype=np.int32))
+        np.save(os.path.join(tmp_path, 'distances.npy'), np.ascontiguousarray(self.distances, dtype=np.float32))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version}, f)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, version=None):
+        """Memuat tabel dari disk dengan memory map. None jika folder tidak
+        ada atau dibuat dari versi dataset yang berbeda."""
+        try:
+            with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                saved_version = json.load(f)['version']
+            if version is not None and saved_version != version:
+                return None
+            indices = np.load(os.path.join(path, 'indices.npy'), mmap_mode='c')
+            distances = np.load(os.path.join(path, 'distances.npy'), mmap_mode='c')
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(indices, distances, saved_version)
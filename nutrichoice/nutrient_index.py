@@ -0,0 +1,49 @@
+import numpy as np
+
+
+class NutrientIndex:
+    """Indeks nilai terdekat untuk satu kolom nutrisi.
+
+    Nilai diurutkan sekali saat dibuat. Pencarian k nilai terdekat memakai
+    binary search lalu ekspansi dua pointer (O(log n + k)), dan pencarian
+    rentang memakai dua binary search pada array yang sama. Baris dengan
+    nilai NaN tidak ikut diindeks.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        self.order = valid[np.argsort(values[valid], kind='stable')]
+        self.sorted_values = values[self.order]
+
+    def __len__(self):
+        return len(self.sorted_values)
+
+    def nearest(self, value, k=5):
+        """Posisi baris dan jarak absolut untuk k nilai terdekat ``value``."""
+        n = len(self.sorted_values)
+        k = min(k, n)
+        right = int(np.searchsorted(self.sorted_values, value))
+        left = right - 1
+        picked = []
+        while len(picked) < k:
+            if left < 0:
+                picked.append(right)
+                right += 1
+            elif right >= n:
+                picked.append(left)
+                left -= 1
+            elif value - self.sorted_values[left] <= self.sorted_values[right] - value:
+                picked.append(left)
+                left -= 1
+            else:
+                picked.append(right)
+                right += 1
+        picked = np.asarray(picked, dtype=np.intp)
+        return self.order[picked], np.abs(self.sorted_values[picked] - value)
+
+    def range(self, low=None, high=None):
+        """Posisi baris dengan nilai dalam [low, high], urut menaik."""
+        start = 0 if low is None else int(np.searchsorted(self.sorted_values, low, side='left'))
+        stop = len(self.sorted_values) if high is None else int(np.searchsorted(self.sorted_values, high, side='right'))
+        return self.order[start:max(start, stop)]
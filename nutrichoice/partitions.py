@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from .data import FEATURES, normalize_types
+
+
+class TypePartitions:
+    """Katalog yang dipartisi per tipe makanan, dibuat sekali saat load.
+
+    Untuk setiap tipe disimpan posisi barisnya di DataFrame (peta
+    partisi -> baris) dan array NumPy kontigu per kolom nutrisi, sehingga
+    planner dan filter cukup mengindeks array tanpa operasi string atau
+    salinan DataFrame. ``type_codes`` / ``local_index`` memetakan balik
+    posisi baris ke (tipe, posisi di dalam partisi).
+    """
+
+    def __init__(self, df, columns=FEATURES, type_column='type'):
+        types = df[type_column]
+        if not isinstance(types.dtype, pd.CategoricalDtype):
+            types = normalize_types(types)
+        self.types = list(types.cat.categories)
+        self.type_codes = types.cat.codes.to_numpy()
+        order = np.argsort(self.type_codes, kind='stable')
+        bounds = np.searchsorted(self.type_codes[order], np.arange(len(self.types) + 1))
+        self.local_index = np.full(len(df), -1, dtype=np.int64)
+        self._rows = {}
+        self._columns = {}
+        values = {column: df[column].to_numpy(dtype=float) for column in columns}
+        for code, food_type in enumerate(self.types):
+            rows = order[bounds[code]:bounds[code + 1]]
+            self.local_index[rows] = np.arange(len(rows))
+            self._rows[food_type] = rows
+            self._columns[food_type] = {column: np.ascontiguousarray(v[rows]) for column, v in values.items()}
+        self._empty = np.empty(0, dtype=np.int64)
+
+    def __contains__(self, food_type):
+        return food_type in self._rows
+
+    def counts(self):
+        return {food_type: len(rows) for food_type, rows in self._rows.items()}
+
+    def rows(self, food_type):
+        """Posisi baris DataFrame untuk ``food_type`` (kosong jika tidak ada)."""
+        return self._rows.get(food_type, self._empty)
+
+    def column(self, food_type, column):
+        """Array kontigu nilai ``column`` untuk ``food_type``, sejajar dengan ``rows``."""
+        if food_type not in self._columns:
+            return np.empty(0)
+        return self._columns[food_type][column]
+
+    def select(self, food_types, column):
+        """Gabungan (posisi baris, nilai ``column``) untuk beberapa tipe,
+        terurut menurut posisi baris."""
+        food_types = [t for t in food_types if t in self._rows]
+        if not food_types:
+            return self._empty, np.empty(0)
+        if len(food_types) == 1:
+            return self._rows[food_types[0]], self._columns[food_types[0]][column]
+        rows = np.concatenate([self._rows[t] for t in food_types])
+        values = np.concatenate([self._columns[t][column] for t in food_types])
+        order = np.argsort(rows, kind='stable')
+        return rows[order], values[order]
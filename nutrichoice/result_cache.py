@@ -0,0 +1,169 @@
+"""Cache hasil query (rekomendasi, pencarian nutrisi, rencana makan).
+
+Kunci dibentuk dari nama query dan argumen yang sudah dinormalisasi
+(``normalize_name``) atau dikuantisasi (``quantize``), sehingga query yang
+setara memakai entri yang sama. Lapisan memori memakai LRU dengan batas
+jumlah entri dan TTL opsional; lapisan disk opsional (SQLite) dapat dipakai
+bersama oleh beberapa proses. Semua entri terikat ke ``version`` dataset:
+mengganti versi membuat entri lama tidak terpakai lagi.
+"""
+import copy
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from . import metrics
+
+
+def normalize_name(name):
+    """Nama tanpa spasi di tepi dan spasi ganda."""
+    return ' '.join(str(name).split())
+
+
+def quantize(value, step):
+    """Membulatkan ``value`` ke kelipatan ``step`` terdekat (mis. 10 kkal)."""
+    if value is None:
+        return None
+    return round(round(float(value) / step) * step, 6)
+
+
+def _copy(value):
+    # Hasil disalin agar pemanggil tidak mengubah isi cache (termasuk daftar
+    # MealPlan yang berisi dict dan array)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class _DiskTier:
+    """Tabel SQLite (versi, kunci) -> hasil ter-pickle, aman untuk banyak proses."""
+
+    def __init__(self, path, max_entries):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._puts = 0
+        with self._connection() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS results (version TEXT, key TEXT, value BLOB, "
+                       "created REAL, PRIMARY KEY (version, key))")
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def get(self, version, key, ttl):
+        row = self._connection().execute(
+            "SELECT value, created FROM results WHERE version = ? AND key = ?", (version, key)).fetchone()
+        if row is None or (ttl is not None and time.time() - row[1] > ttl):
+            return None
+        return pickle.loads(row[0])
+
+    def put(self, version, key, value):
+        with self._connection() as db:
+            db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                       (version, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.prune()
+
+    def prune(self):
+        """Membuang entri tertua di atas ``max_entries``. Entri versi lama
+        tidak dihapus langsung karena proses lain mungkin masih memakainya;
+        entri itu tidak lagi dibaca dan akhirnya terbuang oleh batas ini."""
+        with self._connection() as db:
+            db.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM results "
+                       "ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self):
+        with self._connection() as db:
+            db.execute("DELETE FROM results")
+
+
+class ResultCache:
+    """Cache LRU (+ TTL opsional) untuk hasil query, thread-safe.
+
+    ``get_or_compute(namespace, key, compute)`` mengembalikan hasil dari
+    memori, lalu dari disk (jika ``disk_path`` diberikan), dan baru
+    memanggil ``compute()`` jika keduanya kosong. ``key`` harus sudah
+    dinormalisasi oleh pemanggil dan dapat diserialisasi ke JSON.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None, version='', disk_path=None, max_disk_entries=100_000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version
+        self.disk = _DiskTier(disk_path, max_disk_entries) if disk_path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('hits', 'disk_hits', 'misses', 'evictions', 'expired'), 0)
+
+    def set_version(self, version):
+        """Mengikat cache ke versi dataset baru; entri memori versi lama dibuang."""
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _count(self, name):
+        self._stats[name] += 1
+        metrics.count(f"result_cache_{name}")
+
+    def get_or_compute(self, namespace, key, compute):
+        key = json.dumps([namespace, key], ensure_ascii=False, sort_keys=True)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[1] > self.ttl:
+                del self._entries[key]
+                self._count('expired')
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count('hits')
+                return _copy(entry[0])
+            version = self.version
+
+        value = self.disk.get(version, key, self.ttl) if self.disk is not None else None
+        if value is not None:
+            with self._lock:
+                self._count('disk_hits')
+        else:
+            with self._lock:
+                self._count('misses')
+            value = compute()
+            if self.disk is not None and value is not None:
+                self.disk.put(version, key, value)
+
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._count('evictions')
+        return _copy(value)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), max_entries=self.max_entries,
+                         version=self.version[:16])
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 4) if lookups else None
+        return stats
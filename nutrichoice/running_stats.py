@@ -0,0 +1,59 @@
+import numpy as np
+
+
+def _batch_moments(X):
+    """Jumlah, mean dan jumlah kuadrat simpangan per kolom (NaN diabaikan)."""
+    X = np.asarray(X, dtype=float).reshape(-1, np.shape(X)[-1])
+    valid = ~np.isnan(X)
+    count = valid.sum(axis=0).astype(float)
+    total = np.where(valid, X, 0.0).sum(axis=0)
+    mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+    m2 = np.where(valid, (X - mean) ** 2, 0.0).sum(axis=0)
+    return count, mean, m2
+
+
+class RunningStats:
+    """Mean dan variansi per kolom yang diperbarui secara inkremental.
+
+    Memakai rumus gabungan Welford/Chan sehingga penambahan maupun
+    penghapusan satu blok baris tidak perlu membaca ulang seluruh data.
+    """
+
+    def __init__(self, n_features):
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    @classmethod
+    def from_array(cls, X):
+        stats = cls(np.shape(X)[-1])
+        stats.add(X)
+        return stats
+
+    def add(self, X):
+        count_b, mean_b, m2_b = _batch_moments(X)
+        total = self.count + count_b
+        safe = np.where(total > 0, total, 1)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * count_b / safe
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.count * count_b / safe
+        self.count = total
+
+    def remove(self, X):
+        count_b, mean_b, m2_b = _batch_moments(X)
+        total = self.count - count_b
+        safe = np.where(total > 0, total, 1)
+        mean = np.where(total > 0, (self.count * self.mean - count_b * mean_b) / safe, 0.0)
+        delta = mean_b - mean
+        m2 = self.m2 - m2_b - delta ** 2 * total * count_b / np.where(self.count > 0, self.count, 1)
+        self.mean = mean
+        self.m2 = np.where(total > 0, np.maximum(m2, 0.0), 0.0)
+        self.count = total
+
+    @property
+    def variance(self):
+        return np.divide(self.m2, self.count, out=np.zeros_like(self.m2), where=self.count > 0)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
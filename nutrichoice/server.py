@@ -0,0 +1,373 @@
+"""Layanan HTTP JSON NutriChoice berbasis asyncio (tanpa dependensi tambahan).
+
+Endpoint (semua GET, kecuali /meal-plan yang juga menerima POST JSON):
+
+    /health
+    /stats                                  (statistik micro-batching, p50/p99)
+    /metrics                                (teks Prometheus; ?format=json untuk JSON)
+    /search?q=ikan+goreng&prefix=1&limit=20
+    /recommend?name=Abon&k=5
+    /similar?calories=250&proteins=10&fat=8&carbohydrate=30&k=5
+    (/recommend dan /similar menerima &weights=proteins=3,fat=0.5 dan
+     &metric=euclidean|cosine|mahalanobis untuk kemiripan berbobot)
+    /nutrient?nutrient=proteins&value=20&k=10   (atau &low=20&high=30)
+    /calories?gender=pria&weight=70&height=170&age=30&activity=sedang
+              (opsional: &formula=mifflin_st_jeor&scale=pal)
+    /meal-plan?target=2000&n=3
+
+Semua handler memakai satu ``FoodIndex`` di memori. Query kneighbors yang
+datang bersamaan digabung menjadi satu panggilan (micro-batching); query
+lain yang berat (pencarian nama, kemiripan berbobot, nutrisi, rencana
+makan) dijalankan di thread pool agar event loop tetap melayani request.
+``k`` dibatasi 1..MAX_K dan body POST (objek JSON) sampai MAX_BODY_BYTES.
+"""
+import asyncio
+import json
+import math
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from . import metrics
+from .batching import KNeighborsBatcher
+from .calories import calorie_targets
+from .similarity import parse_weights
+
+RESULT_COLUMNS = ['name', 'type', 'calories', 'proteins', 'fat', 'carbohydrate', 'image']
+
+# Batas parameter agar satu request tidak bisa memonopoli server
+MAX_K = 100
+MAX_PLANS = 20
+MAX_BODY_BYTES = 64 * 1024
+# Target kalori harian /meal-plan dan nilai nutrisi /similar (per 100 g)
+TARGET_RANGE = (500, 10_000)
+NUTRIENT_RANGE = (0, 10_000)
+# Batas profil /calories: berat (kg), tinggi (cm), usia (tahun)
+WEIGHT_RANGE = (1, 500)
+HEIGHT_RANGE = (30, 300)
+AGE_RANGE = (1, 120)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _records(df, distances=None):
+    columns = [c for c in RESULT_COLUMNS if c in df.columns]
+    records = []
+    for i, row in enumerate(df[columns].itertuples(index=False)):
+        record = {}
+        for column, value in zip(columns, row):
+            if isinstance(value, (float, np.floating)):
+                value = None if math.isnan(value) else float(value)
+            record[column] = value
+        if distances is not None:
+            record['distance'] = float(distances[i])
+        records.append(record)
+    return records
+
+
+def _number(params, key, default=None, cast=float, low=None, high=None):
+    if key not in params:
+        if default is None:
+            raise HTTPError(400, f"Parameter '{key}' wajib diisi.")
+        return default
+    try:
+        value = cast(params[key])
+    except ValueError:
+        raise HTTPError(400, f"Parameter '{key}' harus berupa angka.")
+    if not math.isfinite(value):
+        raise HTTPError(400, f"Parameter '{key}' harus berupa angka terhingga.")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise HTTPError(400, f"Parameter '{key}' harus di antara {low} dan {high}.")
+    return value
+
+
+def _parse_body(body):
+    """Parameter dari body POST berupa objek JSON."""
+    try:
+        data = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPError(400, "Body JSON tidak valid.")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Body JSON harus berupa objek.")
+    return {str(k): str(v) for k, v in data.items()}
+
+
+class RecommendationService:
+    """Handler endpoint; tidak bergantung pada lapisan HTTP."""
+
+    def __init__(self, index, max_batch_size=64, max_wait_ms=2.0):
+        self.index = index
+        self.batcher = KNeighborsBatcher(index, max_batch_size, max_wait_ms)
+        self.routes = {
+            '/health': self.health,
+            '/stats': self.stats,
+            '/metrics': self.export_metrics,
+            '/search': self.search,
+            '/recommend': self.recommend,
+            '/similar': self.similar,
+            '/nutrient': self.nutrient,
+            '/calories': self.calories,
+            '/meal-plan': self.meal_plan,
+        }
+
+    async def handle(self, path, params):
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(404, f"Endpoint '{path}' tidak ditemukan.")
+        metrics.count('http_requests')
+        with metrics.span(f"http {path}"):
+            return await handler(params)
+
+    async def health(self, params):
+        return {'status': 'ok', 'foods': len(self.index.df), 'version': self.index.version}
+
+    async def stats(self, params):
+        return {'kneighbors_batcher': self.batcher.stats(), 'result_cache': self.index.result_cache.stats()}
+
+    async def export_metrics(self, params):
+        if params.get('format') == 'json':
+            return metrics.REGISTRY.snapshot()
+        return metrics.REGISTRY.prometheus_text()
+
+    async def kneighbors(self, vector, n_neighbors):
+        return await asyncio.wrap_future(self.batcher.submit(vector, n_neighbors))
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Menjalankan pekerjaan CPU di thread pool agar event loop tidak tertahan."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    def _k(self, params, default):
+        return _number(params, 'k', default, int, low=1, high=min(MAX_K, len(self.index.df) - 1))
+
+    async def search(self, params):
+        query = params.get('q', '').strip()
+        if not query:
+            raise HTTPError(400, "Parameter 'q' wajib diisi.")
+        limit = _number(params, 'limit', 20, int, low=1, high=MAX_K)
+        result = await self.run_blocking(self.index.search_names, query, prefix=params.get('prefix') == '1',
+                                         limit=limit)
+        return {'query': query, 'results': _records(result)}
+
+    async def _weighted(self, params, **query):
+        try:
+            return await self.run_blocking(
+                self.index.query_weighted, weights=parse_weights(params.get('weights'), self.index.features),
+                metric=params.get('metric', 'euclidean'), **query)
+        except ValueError as exc:
+            raise HTTPError(400, str(exc))
+
+    async def recommend(self, params):
+        name = params.get('name', '')
+        k = self._k(params, 5)
+        row = self.index.lookup(name)
+        if row is None:
+            raise HTTPError(404, f"Makanan '{name}' tidak ditemukan dalam dataset.")
+        if 'weights' in params or 'metric' in params:
+            result = await self._weighted(params, name=name, n_neighbors=k)
+            return {'name': name, 'results': _records(result, result['distance'].to_numpy())}
+        table = self.index.neighbor_table
+        if table is not None and k <= table.k:
+            rows, distances = table.neighbors(row, k)
+        else:
+            vector = self.index.df.loc[row, self.index.features].to_numpy(dtype=float)
+            distances, rows = await self.kneighbors(vector, k + 1)
+            keep = rows != row
+            rows, distances = rows[keep][:k], distances[keep][:k]
+        return {'name': name, 'results': _records(self.index.df.iloc[rows], distances)}
+
+    async def similar(self, params):
+        vector = [_number(params, feature, None, float, *NUTRIENT_RANGE) for feature in self.index.features]
+        k = self._k(params, 5)
+        if 'weights' in params or 'metric' in params:
+            result = await self._weighted(params, vector=vector, n_neighbors=k)
+            return {'query': dict(zip(self.index.features, vector)),
+                    'results': _records(result, result['distance'].to_numpy())}
+        distances, rows = await self.kneighbors(vector, k)
+        return {'query': dict(zip(self.index.features, vector)),
+                'results': _records(self.index.df.iloc[rows], distances)}
+
+    async def nutrient(self, params):
+        column = params.get('nutrient', '')
+        if column not in self.index.features:
+            raise HTTPError(400, f"Kolom nutrisi '{column}' tidak tersedia. "
+                                 f"Gunakan: {', '.join(self.index.features)}.")
+        if 'low' in params or 'high' in params:
+            low = _number(params, 'low', float('-inf'))
+            high = _number(params, 'high', float('inf'))
+            result = await self.run_blocking(self.index.nutrient_range, column, low, high)
+            return {'nutrient': column, 'results': _records(result)}
+        value, k = _number(params, 'value'), self._k(params, 10)
+        result = await self.run_blocking(self.index.nearest_by_nutrient, column, value, k)
+        return {'nutrient': column, 'results': _records(result, result['distance'].to_numpy())}
+
+    async def calories(self, params):
+        weight = _number(params, 'weight', None, float, *WEIGHT_RANGE)
+        height = _number(params, 'height', None, float, *HEIGHT_RANGE)
+        age = _number(params, 'age', None, int, *AGE_RANGE)
+        try:
+            targets = calorie_targets(
+                params.get('gender', ''), weight, height, age, params.get('activity', ''),
+                formula=params.get('formula', 'harris_benedict'), scale=params.get('scale', 'umum'),
+            )
+        except ValueError as exc:
+            raise HTTPError(400, str(exc))
+        bmr, daily, deficit_500, deficit_750 = (round(float(targets[key][0]), 2)
+                                                for key in ('bmr', 'tdee', 'defisit_500', 'defisit_750'))
+        return {'bmr': bmr, 'daily_calories': daily, 'deficit_500': deficit_500, 'deficit_750': deficit_750}
+
+    async def meal_plan(self, params):
+        target = _number(params, 'target', None, float, *TARGET_RANGE)
+        n_plans = _number(params, 'n', 3, int, low=1, high=MAX_PLANS)
+        plans = await self.run_blocking(self.index.meal_plans, target, n_plans=n_plans)
+        names = self.index.df['name'].to_numpy(dtype=object)
+        return {'target': target, 'plans': [{
+            'total': plan.total,
+            'deviation': plan.deviation,
+            'meals': {meal: {'foods': names[rows].tolist(), 'calories': plan.meal_calories[meal]}
+                      for meal, rows in plan.meals.items()},
+        } for plan in plans]}
+
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length < 0:
+        raise ValueError("Content-Length negatif.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Body melebihi {MAX_BODY_BYTES} byte.")
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    # Payload string dikirim apa adanya (format teks Prometheus)
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json'
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + body)
+
+
+async def serve(index, host='127.0.0.1', port=8000, max_batch_size=64, max_wait_ms=2.0):
+    """Menjalankan layanan sampai dihentikan (Ctrl+C)."""
+    service = RecommendationService(index, max_batch_size, max_wait_ms)
+    service.batcher.start()
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as exc:
+                    # Body tidak dibaca, jadi koneksi tidak bisa dipakai ulang
+                    _write_response(writer, exc.status, {'error': exc.message}, False)
+                    break
+                except (ValueError, asyncio.IncompleteReadError):
+                    _write_response(writer, 400, {'error': "Request tidak valid."}, False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                url = urlsplit(target)
+                params = dict(parse_qsl(url.query))
+                try:
+                    if method == 'POST' and body:
+                        params.update(_parse_body(body))
+                    elif method not in ('GET', 'POST'):
+                        raise HTTPError(405, f"Metode {method} tidak didukung.")
+                    status, payload = 200, await service.handle(url.path, params)
+                except HTTPError as exc:
+                    status, payload = exc.status, {'error': exc.message}
+                except Exception as exc:
+                    status, payload = 500, {'error': str(exc)}
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    print(f"NutriChoice API berjalan di http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.batcher.stop()
+
+
+# =======================
+# Load generator untuk benchmark lokal
+# =======================
+async def _client(host, port, paths, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b' 200 ' not in status_line:
+                errors.append(status_line.decode('latin-1').strip())
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, paths, concurrency=32, requests=2000):
+    """Mengirim ``requests`` request GET (bergiliran dari ``paths``) lewat
+    ``concurrency`` koneksi keep-alive, lalu mengembalikan statistik latensi."""
+    per_client = [[paths[(c + i * concurrency) % len(paths)]
+                   for i in range(requests // concurrency + (c < requests % concurrency))]
+                  for c in range(concurrency)]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, p, latencies, errors) for p in per_client if p))
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+        'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None,
+    }
@@ -0,0 +1,116 @@
+import numpy as np
+
+METRICS = ('euclidean', 'cosine', 'mahalanobis')
+
+
+def parse_weights(text, features):
+    """Bobot fitur dari teks 'proteins=3,fat=0.5' (fitur lain berbobot 1)."""
+    weights = dict.fromkeys(features, 1.0)
+    for part in str(text or '').split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"Fitur '{name}' tidak dikenal. Gunakan: {', '.join(features)}.")
+        weights[name] = float(value)
+    return weights
+
+
+class SimilarityMatrix:
+    """Jarak berbobot ke semua makanan tanpa fit ulang pipeline.
+
+    Vektor terskala disimpan sekali sebagai matriks float32 kontigu ``Y``
+    beserta hasil kali pasangan fiturnya (y_j * y_k, j <= k). Setiap metrik
+    adalah bentuk kuadrat (x - y)^T M (x - y) dengan M bergantung pada
+    bobot dan metrik (diagonal bobot untuk euclidean/cosine, matriks presisi
+    data yang diskalakan bobot untuk mahalanobis), sehingga jarak ke semua
+    baris cukup dihitung dengan dua perkalian matriks-vektor:
+
+        ||x - y||_M^2 = x^T M x + products @ m - 2 * Y @ (M x)
+
+    Kandidat top-k dari hasil float32 lalu dihitung ulang secara eksak
+    (float64) agar urutannya sama dengan perhitungan langsung.
+    """
+
+    def __init__(self, scaled):
+        self.scaled = np.asarray(scaled, dtype=float)
+        self.matrix = np.ascontiguousarray(self.scaled, dtype=np.float32)
+        self._upper = np.triu_indices(self.matrix.shape[1])
+        self.products = np.ascontiguousarray(self.matrix[:, self._upper[0]] * self.matrix[:, self._upper[1]])
+        self._precision = None
+
+    def __len__(self):
+        return len(self.matrix)
+
+    @property
+    def precision(self):
+        """Invers kovarians fitur terskala (untuk mahalanobis), dihitung sekali."""
+        if self._precision is None:
+            covariance = np.cov(self.scaled, rowvar=False)
+            self._precision = np.linalg.pinv(covariance + 1e-9 * np.eye(len(covariance)))
+        return self._precision
+
+    def metric_matrix(self, weights=None, metric='euclidean'):
+        if metric not in METRICS:
+            raise ValueError(f"Metrik '{metric}' tidak dikenal. Gunakan: {', '.join(METRICS)}.")
+        d = self.matrix.shape[1]
+        w = np.ones(d) if weights is None else np.asarray(weights, dtype=float).reshape(d)
+        if (w < 0).any():
+            raise ValueError("Bobot fitur tidak boleh negatif.")
+        if metric == 'mahalanobis':
+            root = np.sqrt(w)
+            return root[:, None] * self.precision * root[None, :]
+        return np.diag(w)
+
+    def _scores(self, Q, M, rows, metric):
+        # Jarak kuadrat (atau 1 - cosine) float32 untuk setiap query x baris
+        j, k = self._upper
+        coef = np.where(j == k, M[j, k], 2 * M[j, k]).astype(np.float32)
+        Y = self.matrix if rows is None else self.matrix[rows]
+        products = self.products if rows is None else self.products[rows]
+        yMy = products @ coef
+        cross = (Y @ (Q @ M).T.astype(np.float32)).T
+        qMq = np.einsum('ij,jk,ik->i', Q, M, Q)[:, None]
+        if metric == 'cosine':
+            return 1 - cross / np.sqrt(np.maximum(yMy[None, :] * qMq, 1e-12))
+        return qMq + yMy[None, :] - 2 * cross
+
+    def _exact(self, Q, M, positions, metric):
+        Y = self.scaled[positions]
+        if metric == 'cosine':
+            norm = np.sqrt(np.maximum(np.einsum('qnj,jk,qnk->qn', Y, M, Y) * np.einsum('qj,jk,qk->q', Q, M, Q)[:, None],
+                                      1e-12))
+            return 1 - np.einsum('qnj,jk,qk->qn', Y, M, Q) / norm
+        diff = Y - Q[:, None, :]
+        return np.sqrt(np.maximum(np.einsum('qnj,jk,qnk->qn', diff, M, diff), 0.0))
+
+    def top_k(self, Q, k, weights=None, metric='euclidean', rows=None, exclude=None):
+        """k baris terdekat untuk setiap vektor terskala di ``Q``.
+
+        ``rows`` membatasi pencarian ke posisi tertentu (mis. hasil filter),
+        ``exclude`` berisi satu posisi per query yang tidak boleh muncul
+        (mis. makanan itu sendiri). Mengembalikan ``(jarak, posisi)``
+        berbentuk (q, k); jarak cosine adalah 1 - kemiripan.
+        """
+        Q = np.atleast_2d(np.asarray(Q, dtype=float))
+        M = self.metric_matrix(weights, metric)
+        candidates = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        scores = self._scores(Q, M, rows, metric)
+        if exclude is not None:
+            scores[np.asarray(exclude)[:, None] == candidates[None, :]] = np.inf
+        excluded = exclude is not None and bool(np.isin(exclude, candidates).any())
+        k = max(0, min(k, len(candidates) - excluded))
+        if k == 0:
+            return np.empty((len(Q), 0)), np.empty((len(Q), 0), dtype=np.int64)
+
+        fetch = min(len(candidates), max(2 * k, k + 16))
+        if fetch < len(candidates):
+            picked = np.argpartition(scores, fetch - 1, axis=1)[:, :fetch]
+        else:
+            picked = np.broadcast_to(np.arange(len(candidates)), (len(Q), fetch))
+        positions = candidates[picked]
+        distances = self._exact(Q, M, positions, metric)
+        distances[np.take_along_axis(scores, picked, axis=1) == np.inf] = np.inf
+        order = np.lexsort((positions, distances), axis=-1)[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(positions, order, axis=1)
@@ -0,0 +1,136 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Huruf kecil dan tanpa aksen, supaya 'Sate' dan 'saté' dianggap sama."""
+    text = unicodedata.normalize('NFKD', str(text).casefold())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+class TokenIndex:
+    """Inverted index dari token nama makanan ke posisi baris.
+
+    Token diurutkan sekali sehingga pencarian prefix (untuk autocomplete)
+    cukup dengan binary search. Pencarian multi-token diberi skor jumlah
+    token query yang cocok; nama yang lebih pendek diutamakan saat seri.
+    """
+
+    def __init__(self, names):
+        postings = {}
+        lengths = []
+        for row, name in enumerate(names):
+            tokens = tokenize(name) if isinstance(name, str) else []
+            lengths.append(len(tokens))
+            for token in set(tokens):
+                postings.setdefault(token, []).append(row)
+        self.postings = {token: np.asarray(rows, dtype=np.int32) for token, rows in postings.items()}
+        self.tokens = sorted(self.postings)
+        self.lengths = np.asarray(lengths, dtype=np.int32)
+
+    def prefix_tokens(self, prefix):
+        """Semua token yang diawali ``prefix``."""
+        start = bisect_left(self.tokens, prefix)
+        stop = bisect_left(self.tokens, prefix + '\U0010ffff', lo=start)
+        return self.tokens[start:stop]
+
+    def _rows_for(self, token, prefix):
+        if not prefix:
+            return self.postings.get(token, np.empty(0, dtype=np.int32))
+        matches = [self.postings[t] for t in self.prefix_tokens(token)]
+        if not matches:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(matches))
+
+    def search(self, query, prefix=False, require_all=True, limit=None):
+        """Posisi baris yang cocok dengan ``query``, terurut berdasarkan skor.
+
+        Dengan ``prefix=True`` token terakhir query dicocokkan sebagai awalan
+        (mis. 'ikan gor' cocok dengan 'Ikan Goreng'). Dengan
+        ``require_all=False`` baris yang hanya cocok sebagian ikut
+        dikembalikan di bawah baris yang cocok penuh.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        per_token = [self._rows_for(token, prefix and i == len(tokens) - 1)
+                     for i, token in enumerate(tokens)]
+        rows, scores = np.unique(np.concatenate(per_token), return_counts=True)
+        if require_all:
+            keep = scores == len(tokens)
+            rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((rows, self.lengths[rows], -scores))
+        rows = rows[order]
+        return rows if limit is None else rows[:limit]
+
+
+def trigrams(text):
+    padded = f"  {' '.join(tokenize(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Jarak Levenshtein dua string (dipakai hanya untuk sedikit kandidat)."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class TrigramIndex:
+    """Pencocokan nama yang toleran salah ketik.
+
+    Kandidat dicari lewat inverted index trigram karakter (hanya nama yang
+    berbagi trigram dengan query yang disentuh), diberi skor Dice, lalu
+    sejumlah kecil kandidat teratas diurutkan ulang dengan edit distance.
+    """
+
+    def __init__(self, names, candidates=20):
+        self.names = list(dict.fromkeys(n for n in names if isinstance(n, str)))
+        self.normalized = [' '.join(tokenize(n)) for n in self.names]
+        self.candidates = candidates
+        postings = {}
+        sizes = []
+        for i, name in enumerate(self.names):
+            grams = trigrams(name)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.sizes = np.asarray(sizes, dtype=np.int32)
+
+    def match(self, query, limit=5, min_score=0.3):
+        """Nama terbaik untuk ``query`` sebagai daftar (nama, skor 0..1)."""
+        grams = trigrams(query)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return []
+        ids, shared = np.unique(np.concatenate(hits), return_counts=True)
+        dice = 2.0 * shared / (len(grams) + self.sizes[ids])
+        top = np.argsort(-dice, kind='stable')[:self.candidates]
+
+        target = ' '.join(tokenize(query))
+        ranked = []
+        for pos in top:
+            i = ids[pos]
+            name = self.normalized[i]
+            similarity = 1.0 - edit_distance(target, name) / max(len(target), len(name), 1)
+            score = 0.5 * dice[pos] + 0.5 * similarity
+            if score >= min_score:
+                ranked.append((score, i))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.names[i], round(float(score), 3)) for score, i in ranked[:limit]]
@@ -0,0 +1,182 @@
+import base64
+import hashlib
+import io
+import os
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow opsional: tanpa Pillow gambar disimpan apa adanya
+    Image = None
+
+USER_AGENT = "Mozilla/5.0 (compatible; NutriChoice thumbnail fetcher)"
+
+# Skema lain (file:, ftp:, ...) ditolak agar nilai kolom image tidak bisa
+# dipakai untuk membaca file lokal
+ALLOWED_SCHEMES = ('http', 'https')
+
+
+def _check_scheme(url):
+    if urlsplit(url).scheme.lower() not in ALLOWED_SCHEMES:
+        raise ValueError(f"Skema URL tidak didukung: '{url}'.")
+
+
+class _RedirectHandler(urllib.request.HTTPRedirectHandler):
+    # Pengalihan juga tidak boleh keluar dari http/https (mis. ke ftp:)
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        _check_scheme(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_RedirectHandler)
+
+
+def http_get(url, timeout=10):
+    """Mengunduh ``url`` (http/https) dan mengembalikan bytes. URL ``data:``
+    didekode langsung; skema lain menghasilkan ValueError."""
+    if url.startswith('data:'):
+        header, _, payload = url.partition(',')
+        return base64.b64decode(payload) if header.endswith(';base64') else payload.encode('utf-8')
+    _check_scheme(url)
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with _opener.open(request, timeout=timeout) as response:
+        return response.read()
+
+
+def resize_image(data, width):
+    """Memperkecil gambar ke lebar ``width`` piksel dan menyimpannya sebagai JPEG."""
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGB')
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format='JPEG', quality=80, optimize=True)
+        return out.getvalue()
+
+
+def _url_key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class ThumbnailCache:
+    """Cache thumbnail lokal untuk kolom ``image``.
+
+    Thumbnail disimpan content-addressed di ``blobs/<sha256 isi>.jpg``
+    (gambar yang sama dari URL berbeda hanya disimpan sekali), dan
+    ``refs/<sha256 url>`` menunjuk ke blob tersebut. Total ukuran blob
+    dibatasi ``max_bytes``; blob yang paling lama tidak dipakai dibuang
+    lebih dulu (LRU berdasarkan waktu modifikasi yang diperbarui saat dibaca).
+    """
+
+    def __init__(self, cache_dir, width=140, max_bytes=200 * 1024 * 1024, fetch=http_get):
+        self.cache_dir = cache_dir
+        self.width = width
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.ref_dir = os.path.join(cache_dir, 'refs')
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, f"{digest}.jpg")
+
+    def _ref_path(self, url):
+        return os.path.join(self.ref_dir, _url_key(url))
+
+    def _digest_for(self, url):
+        try:
+            with open(self._ref_path(url), encoding='ascii') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def get(self, url):
+        """Bytes thumbnail untuk ``url``, atau None jika belum ada di cache."""
+        digest = self._digest_for(url)
+        if digest is None:
+            return None
+        path = self._blob_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def data_uri(self, url):
+        data = self.get(url)
+        if data is None:
+            return None
+        return "data:image/jpeg;base64," + base64.b64encode(data).decode('ascii')
+
+    def contains(self, url):
+        digest = self._digest_for(url)
+        return digest is not None and os.path.exists(self._blob_path(digest))
+
+    def put(self, url, data):
+        """Memperkecil dan menyimpan gambar asli ``data`` untuk ``url``."""
+        thumbnail = resize_image(data, self.width)
+        digest = hashlib.sha256(thumbnail).hexdigest()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.ref_dir, exist_ok=True)
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            # Nama sementara unik per thread: prefetch bisa menulis blob yang
+            # sama dari beberapa URL sekaligus
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(thumbnail)
+            os.replace(tmp_path, path)
+        ref_path = self._ref_path(url)
+        tmp_ref = f"{ref_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_ref, 'w', encoding='ascii') as f:
+            f.write(digest)
+        os.replace(tmp_ref, ref_path)
+        return digest
+
+    def _fetch_one(self, url):
+        try:
+            self.put(url, self.fetch(url))
+            return 'fetched'
+        except Exception:
+            return 'failed'
+
+    def prefetch(self, urls, workers=8, refresh=False):
+        """Mengunduh dan memperkecil semua ``urls`` yang belum ada di cache
+        secara paralel, lalu menjalankan eviction. Mengembalikan statistik."""
+        urls = [u for u in dict.fromkeys(urls) if isinstance(u, str) and u]
+        todo = urls if refresh else [u for u in urls if not self.contains(u)]
+        stats = {'cached': len(urls) - len(todo), 'fetched': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for status in pool.map(self._fetch_one, todo):
+                stats[status] += 1
+        stats['evicted'] = self.evict()
+        return stats
+
+    def evict(self):
+        """Membuang blob yang paling lama tidak dipakai sampai total ukuran
+        di bawah ``max_bytes``. Ref yang blob-nya hilang dianggap miss."""
+        if not os.path.isdir(self.blob_dir):
+            return 0
+        entries = []
+        for entry in os.scandir(self.blob_dir):
+            if entry.is_file() and entry.name.endswith('.jpg'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,241 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .data import FEATURES
+from .meal_planner import MEAL_SHARES, MEAL_SLOTS, _MealCombos, default_tolerances
+from .partitions import TypePartitions
+
+DayPlan = namedtuple('DayPlan', ['meals', 'totals', 'error'])
+WeeklyPlan = namedtuple('WeeklyPlan', ['days', 'error'])
+
+
+def macro_targets(calories, protein_share=0.20, fat_share=0.30, carb_share=0.50):
+    """Target harian makro dari kebutuhan kalori dan porsi energi tiap makro
+    (faktor Atwater: protein & karbohidrat 4 kkal/g, lemak 9 kkal/g)."""
+    return {
+        'calories': calories,
+        'proteins': calories * protein_share / 4,
+        'fat': calories * fat_share / 9,
+        'carbohydrate': calories * carb_share / 4,
+    }
+
+
+def _error(totals, target, weights):
+    """Galat kuadrat relatif berbobot terhadap target makro (sumbu terakhir)."""
+    return ((((totals - target) / np.maximum(target, 1.0)) ** 2) * weights).sum(axis=-1)
+
+
+class _MealCandidates:
+    """Kombinasi terbaik satu waktu makan: baris per slot, total makro, id hidangan."""
+
+    def __init__(self, rows, macros, dishes):
+        self.rows = rows
+        self.macros = macros
+        self.dishes = dishes
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class WeeklyPlanner:
+    """Perencana menu beberapa hari dengan target makro dan variasi.
+
+    Untuk setiap waktu makan, kombinasi yang masuk toleransi kalori
+    dienumerasi sekali (seperti ``plan_meals``; paling banyak
+    ``max_combinations``, mulai dari kalori yang paling dekat ke porsinya)
+    lalu ``candidates_per_meal`` kombinasi dengan makro paling dekat ke
+    porsinya disimpan. Setiap hari
+    disusun dengan beam search atas kandidat tersebut, dengan hidangan
+    yang sudah dipakai dalam ``no_repeat_days`` hari terakhir dilarang.
+    Setelah itu local search menukar satu waktu makan per langkah selama
+    galat harian membaik dan batasan variasi tetap terpenuhi.
+    """
+
+    def __init__(self, df, partitions=None, meal_slots=MEAL_SLOTS, meal_shares=MEAL_SHARES,
+                 candidates_per_meal=300, beam_width=32, weights=(4.0, 1.0, 1.0, 1.0),
+                 max_combinations=1_000_000):
+        self.partitions = partitions or TypePartitions(df, columns=FEATURES)
+        self.values = df[FEATURES].to_numpy(dtype=float)
+        self.names = df['name'].to_numpy(dtype=object)
+        self.dish_ids = pd.factorize(df['name'].str.strip().str.lower())[0]
+        self.meal_slots = meal_slots
+        self.meal_names = list(meal_slots)
+        self.meal_shares = np.array([meal_shares[m] for m in self.meal_names])
+        self.candidates_per_meal = candidates_per_meal
+        self.beam_width = beam_width
+        self.weights = np.asarray(weights, dtype=float)
+        self.max_combinations = max_combinations
+
+    def _candidates(self, meal, share, target, meal_tolerance):
+        slot_rows, slot_units = [], []
+        for categories in self.meal_slots[meal]:
+            rows, calories = self.partitions.select(categories, 'calories')
+            slot_rows.append(rows)
+            slot_units.append(np.rint(calories).astype(np.int64))
+        combos = _MealCombos(slot_rows, slot_units, int(round(share * target[0])), int(meal_tolerance))
+        rows = combos.take(self.max_combinations)
+        if not len(rows):
+            return _MealCandidates(np.empty((0, len(slot_rows)), dtype=np.int64), np.empty((0, 4)),
+                                   np.empty((0, len(slot_rows)), dtype=np.int64))
+        dishes = self.dish_ids[rows]
+        distinct = np.ones(len(rows), dtype=bool)
+        for a in range(dishes.shape[1]):
+            for b in range(a + 1, dishes.shape[1]):
+                distinct &= dishes[:, a] != dishes[:, b]
+        rows, dishes = rows[distinct], dishes[distinct]
+        macros = self.values[rows].sum(axis=1)
+        errors = _error(macros, share * target, self.weights)
+
+        # Ambil kandidat terbaik, tetapi setiap hidangan dibatasi muncul di
+        # sebagian kecil kandidat agar larangan pengulangan tidak menghabiskan
+        # seluruh kandidat (mis. kategori minuman yang hanya berisi sedikit item)
+        scan = min(50 * self.candidates_per_meal, len(rows))
+        order = np.argpartition(errors, scan - 1)[:scan] if scan < len(rows) else np.arange(len(rows))
+        order = order[np.argsort(errors[order], kind='stable')]
+        cap = max(3, self.candidates_per_meal // 20)
+        uses = {}
+        best = []
+        for i in order.tolist():
+            if any(uses.get(d, 0) >= cap for d in dishes[i].tolist()):
+                continue
+            for d in dishes[i].tolist():
+                uses[d] = uses.get(d, 0) + 1
+            best.append(i)
+            if len(best) >= self.candidates_per_meal:
+                break
+        best = np.asarray(best, dtype=np.int64)
+        return _MealCandidates(rows[best], macros[best], dishes[best])
+
+    def _plan_day(self, candidates, target, banned):
+        cumulative = np.cumsum(self.meal_shares)
+        sums = np.zeros((1, 4))
+        picks = np.zeros((1, 0), dtype=np.int64)
+        used = [np.empty(0, dtype=np.int64)]
+        for m, cand in enumerate(candidates):
+            allowed = np.flatnonzero(~banned[cand.dishes].any(axis=1))
+            if not len(allowed):
+                return None
+            totals = sums[:, None, :] + cand.macros[None, allowed, :]
+            errors = _error(totals, cumulative[m] * target, self.weights)
+            metrics.count('weekly_beam_states_evaluated', errors.size)
+            for b, dishes in enumerate(used):
+                if len(dishes):
+                    errors[b, np.isin(cand.dishes[allowed], dishes).any(axis=1)] = np.inf
+            flat = np.argsort(errors, axis=None, kind='stable')[:self.beam_width]
+            flat = flat[np.isfinite(errors.ravel()[flat])]
+            if not len(flat):
+                return None
+            state, choice = np.unravel_index(flat, errors.shape)
+            sums = totals[state, choice]
+            picks = np.hstack([picks[state], allowed[choice][:, None]])
+            used = [np.concatenate([used[s], cand.dishes[allowed[c]]]) for s, c in zip(state, choice)]
+        return picks[0]
+
+    def _day_totals(self, candidates, picks):
+        return sum(cand.macros[p] for cand, p in zip(candidates, picks))
+
+    def _banned(self, day_picks, candidates, day, no_repeat_days, skip_meal=None):
+        """Hidangan yang tidak boleh dipakai pada ``day``: yang muncul di hari
+        lain dalam jendela ``no_repeat_days`` dan di waktu makan lain hari itu."""
+        banned = np.zeros(len(self.names), dtype=bool)
+        for other, picks in enumerate(day_picks):
+            if picks is None or abs(other - day) >= no_repeat_days or other == day:
+                continue
+            for cand, p in zip(candidates, picks):
+                banned[cand.dishes[p]] = True
+        if skip_meal is not None:
+            for m, (cand, p) in enumerate(zip(candidates, day_picks[day])):
+                if m != skip_meal:
+                    banned[cand.dishes[p]] = True
+        return banned
+
+    @metrics.timed('weekly_plan')
+    def plan(self, targets, n_days=7, no_repeat_days=3, local_search_passes=3):
+        """Rencana ``n_days`` hari untuk target makro harian ``targets`` (dict
+        seperti hasil ``macro_targets``). Hidangan yang sama tidak muncul lagi
+        dalam ``no_repeat_days`` hari. None jika batasan tidak dapat dipenuhi.
+        """
+        target = np.array([float(targets[m]) for m in FEATURES])
+        _, meal_tolerance = default_tolerances(target[0])
+        candidates = [self._candidates(meal, share, target, meal_tolerance)
+                      for meal, share in zip(self.meal_names, self.meal_shares)]
+        if any(len(c) == 0 for c in candidates):
+            return None
+
+        day_picks = [None] * n_days
+        for day in range(n_days):
+            day_picks[day] = self._plan_day(candidates, target,
+                                            self._banned(day_picks, candidates, day, no_repeat_days))
+            if day_picks[day] is None:
+                return None
+
+        # Local search: ganti satu waktu makan jika galat harian turun
+        for _ in range(local_search_passes):
+            improved = False
+            for day in range(n_days):
+                for m, cand in enumerate(candidates):
+                    picks = day_picks[day]
+                    banned = self._banned(day_picks, candidates, day, no_repeat_days, skip_meal=m)
+                    allowed = np.flatnonzero(~banned[cand.dishes].any(axis=1))
+                    rest = self._day_totals(candidates, picks) - cand.macros[picks[m]]
+                    errors = _error(rest + cand.macros[allowed], target, self.weights)
+                    best = allowed[np.argmin(errors)]
+                    if errors.min() < _error(rest + cand.macros[picks[m]], target, self.weights) - 1e-12:
+                        picks[m] = best
+                        improved = True
+            if not improved:
+                break
+
+        days = []
+        for picks in day_picks:
+            totals = self._day_totals(candidates, picks)
+            days.append(DayPlan(
+                meals={meal: [int(r) for r in cand.rows[p]]
+                       for meal, cand, p in zip(self.meal_names, candidates, picks)},
+                totals={macro: round(float(v), 1) for macro, v in zip(FEATURES, totals)},
+                error=float(_error(totals, target, self.weights)),
+            ))
+        return WeeklyPlan(days=days, error=float(sum(d.error for d in days)))
+
+
+def plan_week(df, targets, n_days=7, no_repeat_days=3, **options):
+    """Satu rencana mingguan untuk ``targets`` (lihat ``WeeklyPlanner``)."""
+    return WeeklyPlanner(df, **options).plan(targets, n_days=n_days, no_repeat_days=no_repeat_days)
+
+
+_worker_planner = None
+
+
+def _init_worker(df, options):
+    global _worker_planner
+    _worker_planner = WeeklyPlanner(df, **options)
+
+
+def _plan_in_worker(args):
+    targets, n_days, no_repeat_days = args
+    return _worker_planner.plan(targets, n_days=n_days, no_repeat_days=no_repeat_days)
+
+
+def plan_weeks(df, targets_list, n_days=7, no_repeat_days=3, processes=None, **options):
+    """Rencana mingguan untuk banyak pengguna sekaligus.
+
+    Secara bawaan (``processes=None`` atau 1) semua dijalankan di proses
+    ini. Dengan ``processes`` > 1 (-1 = semua core) dan lebih dari satu
+    target, tugas dibagi ke process pool: katalog dikirim sekali ke setiap
+    proses (initializer), lalu hanya target makro yang dikirim per tugas.
+    """
+    columns = ['name', 'type'] + FEATURES
+    tasks = [(targets, n_days, no_repeat_days) for targets in targets_list]
+    workers = (os.cpu_count() or 1) if processes == -1 else (processes or 1)
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        planner = WeeklyPlanner(df[columns], **options)
+        return [planner.plan(t, n_days=n, no_repeat_days=r) for t, n, r in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(df[columns], options)) as pool:
+        return list(pool.map(_plan_in_worker, tasks, chunksize=max(1, len(tasks) // 64)))
@@ -2,11 +2,19 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
-from itertools import product
+import sys
+import html
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nutrichoice import FEATURES, FoodIndex, clean, dataset_hash, load_frame
+from nutrichoice import metrics
+from nutrichoice.calories import calorie_targets
+from nutrichoice.meal_planner import default_tolerances
+from nutrichoice.result_cache import ResultCache, quantize
+from nutrichoice.thumbnails import ThumbnailCache
+from nutrichoice.weekly_planner import WeeklyPlanner, macro_targets
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -15,41 +23,98 @@ st.set_page_config(
     layout="wide"
 )
 
-# Fungsi memuat dan membersihkan data
-@st.cache_data
+# Panel debug tersembunyi: buka aplikasi dengan ?debug=1
+MODE_DEBUG = st.query_params.get("debug") == "1"
+awal_rerun = time.perf_counter()
+if MODE_DEBUG and st.session_state.get("profil_rerun"):
+    metrics.REGISTRY.start_profiling()
+
+# Rumus BMR yang dapat dipilih (lihat nutrichoice.calories.BMR_FORMULAS)
+RUMUS_BMR = {
+    "Harris-Benedict (revisi)": "harris_benedict_revised",
+    "Mifflin-St Jeor": "mifflin_st_jeor",
+    "Harris-Benedict (asli)": "harris_benedict",
+}
+
+# Folder cache untuk katalog biner dan indeks yang sudah di-fit
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".nutrichoice")
+
+# Fungsi memuat dan membersihkan data. cache_resource (bukan cache_data):
+# DataFrame dipakai bersama semua sesi tanpa di-pickle dan disalin per rerun,
+# sehingga kolom tetap menunjuk ke katalog yang di-memory-map (read-only)
+@st.cache_resource
 def load_data():
     base_path = os.path.dirname(__file__)  # ambil folder tempat app.py berada
     file_path = os.path.join(base_path, "nutrition.csv")
-    df = pd.read_csv(file_path)
-    required_cols = ['name', 'image', 'type', 'calories', 'proteins', 'fat', 'carbohydrate']
-    df_clean = df.dropna(subset=required_cols).reset_index(drop=True)
-    return df_clean, ['calories', 'proteins', 'fat', 'carbohydrate']
-
-# Fungsi menampilkan makanan
-def tampilkan_makanan(df_result, jumlah_kolom=2):
-    container = st.container()
-    baris = [df_result[i:i + jumlah_kolom] for i in range(0, len(df_result), jumlah_kolom)]
-    for batch in baris:
-        cols = container.columns(jumlah_kolom)
-        for i, (_, row) in enumerate(batch.iterrows()):
-            with cols[i]:
-                st.markdown("---")
-                st.markdown(f"#### 🍽 {row['name']}")
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    st.image(row['image'], width=140)
-                with col2:
-                    st.markdown(f"""
-                        <div style='font-size:14px; line-height:1.6;'>
-                            <strong>Kalori:</strong> {row['calories']:.1f} kkal<br>
-                            <strong>Protein:</strong> {row['proteins']:.1f} g<br>
-                            <strong>Lemak:</strong> {row['fat']:.1f} g<br>
-                            <strong>Karbo:</strong> {row['carbohydrate']:.1f} g
-                        </div>
-                    """, unsafe_allow_html=True)
+    required_cols = ['name', 'image', 'type'] + FEATURES
+    # Dibaca dari katalog biner (dikonversi sekali dari CSV) agar worker baru cepat siap
+    df_clean = clean(load_frame(file_path, CACHE_DIR), required_cols=required_cols, drop_duplicates=False)
+    return df_clean, FEATURES, dataset_hash(df_clean)
+
+# Indeks KNN dibuat sekali per versi dataset dan dipakai bersama (read-only)
+# oleh semua sesi, sehingga rerun tidak perlu fit ulang
+@st.cache_resource
+def load_index(data_version, _df_clean, features):
+    index = FoodIndex(_df_clean, features=features, n_neighbors=6, version=data_version).load_or_fit(CACHE_DIR)
+    index.load_or_build_table(CACHE_DIR)
+    # Cache hasil query/rencana makan, dengan lapisan disk yang dipakai bersama antar worker
+    index.use_result_cache(ResultCache(max_entries=2048, ttl=24 * 3600,
+                                       disk_path=os.path.join(CACHE_DIR, "results.sqlite")))
+    # Indeks terurut per nutrisi, inverted index nama dan partisi per tipe dibangun sekali saat load
+    for feature in features:
+        index.nutrient_index(feature)
+    index.text_index
+    index.type_partitions()
+    return index
+
+# Perencana mingguan menyimpan nilai makro per baris; dibuat sekali per versi dataset
+@st.cache_resource
+def load_weekly_planner(data_version, _df_clean):
+    return WeeklyPlanner(_df_clean, partitions=load_index(data_version, _df_clean, FEATURES).type_partitions())
+
+# Cache thumbnail lokal (diisi offline dengan `python -m nutrichoice --data streamlit/nutrition.csv thumbnails`)
+@st.cache_resource
+def load_thumbnails():
+    return ThumbnailCache(os.path.join(CACHE_DIR, "thumbnails"))
+
+# HTML kartu makanan untuk satu halaman, dibangun sekaligus untuk semua baris
+def kartu_html(df_page, jumlah_kolom=2):
+    angka = {col: np.char.mod("%.1f", df_page[col].to_numpy(dtype=float)) for col in FEATURES}
+    nama = df_page['name'].map(html.escape)
+    # Pakai thumbnail lokal jika sudah ada, jika belum pakai URL aslinya
+    thumbnails = load_thumbnails()
+    gambar = df_page['image'].map(lambda url: thumbnails.data_uri(url) or html.escape(url, quote=True))
+    kartu = (
+        "<div class='nutri-card'>"
+        "<img class='nutri-image' loading='lazy' decoding='async' width='140' src='" + gambar + "'>"
+        "<div><h4 style='margin:0 0 6px 0;'>🍽 " + nama + "</h4>"
+        "<div style='font-size:14px; line-height:1.6;'>"
+        "<strong>Kalori:</strong> " + angka['calories'] + " kkal<br>"
+        "<strong>Protein:</strong> " + angka['proteins'] + " g<br>"
+        "<strong>Lemak:</strong> " + angka['fat'] + " g<br>"
+        "<strong>Karbo:</strong> " + angka['carbohydrate'] + " g"
+        "</div></div></div>"
+    )
+    return (
+        f"<div style='display:grid; grid-template-columns:repeat({jumlah_kolom}, minmax(0, 1fr)); column-gap:15px;'>"
+        + "".join(kartu.tolist()) + "</div>"
+    )
+
+# Fungsi menampilkan makanan (dengan paginasi untuk hasil yang banyak)
+@metrics.timed("tampilkan_makanan")
+def tampilkan_makanan(df_result, jumlah_kolom=2, per_halaman=20, key="hasil"):
+    jumlah_halaman = max(1, -(-len(df_result) // per_halaman))
+    halaman = 1
+    if jumlah_halaman > 1:
+        halaman = st.number_input(
+            f"Halaman (1-{jumlah_halaman}):", min_value=1, max_value=jumlah_halaman, step=1, key=f"halaman_{key}"
+        )
+    mulai = (halaman - 1) * per_halaman
+    st.markdown(kartu_html(df_result.iloc[mulai:mulai + per_halaman], jumlah_kolom), unsafe_allow_html=True)
 
 # Load data
-df_clean, features = load_data()
+with metrics.span("load_data"):
+    df_clean, features, data_version = load_data()
 
 # Header halaman
 st.markdown("""
@@ -72,27 +137,30 @@ menu = st.sidebar.radio("Navigasi:", [
     "🔥 Hitung Kebutuhan Kalori"
 ])
 
-# Pipeline KNN global
-knn_pipeline = Pipeline([
-    ('imputer', SimpleImputer(strategy='mean')),
-    ('scaler', StandardScaler()),
-    ('knn', NearestNeighbors(n_neighbors=6))
-])
-knn_pipeline.fit(df_clean[features])
+# Indeks KNN global
+with metrics.span("load_index"):
+    knn_index = load_index(data_version, df_clean, features)
 
 # Menu pencarian berdasarkan nama
 if menu == "🔍 Cari Berdasarkan Nama":
     st.title("🔍 Cari Rekomendasi Berdasarkan Nama Makanan")
     input_nama = st.text_input("Masukkan kata kunci nama makanan (contoh: 'ikan')")
+    if input_nama.strip():
+        # Saran autocomplete dari inverted index (kata terakhir dicocokkan sebagai awalan)
+        saran = knn_index.suggest(input_nama, limit=8)
+        if saran:
+            st.caption("💡 Saran: " + " · ".join(saran))
     if st.button("🔍 Cari Rekomendasi") and input_nama.strip():
-        import re
-        pattern = rf"\b{re.escape(input_nama.lower())}\b"
-        hasil_cocok = df_clean[df_clean['name'].str.lower().str.contains(pattern, regex=True, na=False)].reset_index(drop=True)
+        # Simpan posisi hasil di session_state supaya tetap tampil saat pindah halaman
+        st.session_state['hasil_nama'] = (input_nama, knn_index.text_index.search(input_nama))
+    if 'hasil_nama' in st.session_state:
+        kata_kunci, baris_cocok = st.session_state['hasil_nama']
+        hasil_cocok = df_clean.iloc[baris_cocok].reset_index(drop=True)
         if hasil_cocok.empty:
-            st.warning(f"❌ Tidak ditemukan makanan dengan kata '{input_nama}'.")
+            st.warning(f"❌ Tidak ditemukan makanan dengan kata '{kata_kunci}'.")
         else:
-            st.markdown(f"### 🍽 Ditemukan {len(hasil_cocok)} makanan dengan nama *'{input_nama}'*:")
-            tampilkan_makanan(hasil_cocok)
+            st.markdown(f"### 🍽 Ditemukan {len(hasil_cocok)} makanan dengan nama *'{kata_kunci}'*:")
+            tampilkan_makanan(hasil_cocok, key=f"nama_{kata_kunci}")
 
 # Menu pencarian berdasarkan nutrisi
 elif menu == "🥦 Cari Berdasarkan Nutrisi":
@@ -108,26 +176,35 @@ elif menu == "🥦 Cari Berdasarkan Nutrisi":
     }
     nutrisi_label = st.selectbox("Pilih Jenis Nutrisi:", list(nutrisi_dict.keys()))
     nutrisi = nutrisi_dict[nutrisi_label]
-    input_value = st.number_input(f"Masukkan jumlah {nutrisi_label} (gram atau kkal):", min_value=0.0, format="%.1f")
+    mode = st.radio("Mode Pencarian:", ["Mendekati nilai", "Dalam rentang"], horizontal=True)
+    if mode == "Mendekati nilai":
+        input_value = st.number_input(f"Masukkan jumlah {nutrisi_label} (gram atau kkal):", min_value=0.0, format="%.1f")
+    else:
+        col_min, col_max = st.columns(2)
+        with col_min:
+            batas_bawah = st.number_input(f"{nutrisi_label} minimum:", min_value=0.0, format="%.1f")
+        with col_max:
+            batas_atas = st.number_input(f"{nutrisi_label} maksimum:", min_value=0.0, value=batas_bawah, format="%.1f")
     if st.button("Cari Makanan Serupa"):
         if nutrisi not in df_clean.columns:
             st.warning("Data nutrisi ini tidak tersedia dalam dataset.")
-        else:
-            pipeline = Pipeline([
-                ('imputer', SimpleImputer(strategy='mean')),
-                ('scaler', StandardScaler()),
-                ('knn', NearestNeighbors(n_neighbors=10))
-            ])
-            pipeline.fit(df_clean[[nutrisi]])
-            distances, indices = pipeline.named_steps['knn'].kneighbors(
-                pipeline.named_steps['scaler'].transform(
-                    pipeline.named_steps['imputer'].transform([[input_value]])
-                )
-            )
-            rekomendasi = df_clean.iloc[indices[0]]
+        elif mode == "Mendekati nilai":
+            rekomendasi = knn_index.nearest_by_nutrient(nutrisi, input_value, k=10)
             st.markdown("### 📟 Informasi Nutrisi:")
             st.info(f"Menampilkan makanan dengan nilai *{nutrisi_label}* mendekati *{input_value}*")
             tampilkan_makanan(rekomendasi)
+        else:
+            st.session_state['hasil_rentang'] = (nutrisi_label, batas_bawah, batas_atas,
+                                                 knn_index.nutrient_index(nutrisi).range(batas_bawah, batas_atas))
+    if mode == "Dalam rentang" and 'hasil_rentang' in st.session_state:
+        # Hasil rentang bisa banyak: disimpan agar paginasi tetap berfungsi saat rerun
+        label, bawah, atas, baris = st.session_state['hasil_rentang']
+        st.markdown("### 📟 Informasi Nutrisi:")
+        if len(baris) == 0:
+            st.warning(f"❌ Tidak ada makanan dengan *{label}* antara {bawah} dan {atas}.")
+        else:
+            st.info(f"Menampilkan {len(baris)} makanan dengan nilai *{label}* antara *{bawah}* dan *{atas}*")
+            tampilkan_makanan(df_clean.iloc[baris], key=f"rentang_{label}_{bawah}_{atas}")
 
 # Menu kalkulasi kebutuhan kalori + kombinasi rekomendasi makanan
 elif menu == "🔥 Hitung Kebutuhan Kalori":
@@ -141,99 +218,43 @@ elif menu == "🔥 Hitung Kebutuhan Kalori":
         jenis_kelamin = st.radio("Jenis Kelamin:", ["Laki-laki", "Perempuan"])
         aktivitas = st.selectbox("Tingkat Aktivitas Fisik:", ["Rendah", "Sedang", "Tinggi"])
         defisit_opsi = st.selectbox("Pilih Defisit Kalori:", ["Tanpa Defisit", "Defisit 500 kkal", "Defisit 750 kkal"])
+        rumus = st.selectbox("Rumus BMR:", list(RUMUS_BMR))
+    rencana_mingguan = st.checkbox("Tampilkan juga rencana 7 hari (hidangan tidak diulang dalam 3 hari)")
 
     if st.button("Hitung Kalori Harian dan Tampilkan Rekomendasi"):
-        if jenis_kelamin == "Laki-laki":
-            bmr = 88.362 + (13.397 * berat) + (4.799 * tinggi) - (5.677 * usia)
-        else:
-            bmr = 447.593 + (9.247 * berat) + (3.098 * tinggi) - (4.330 * usia)
-        
-        # Faktor aktivitas berdasarkan jenis kelamin
-        if jenis_kelamin == "Laki-laki":
-            faktor_aktivitas = {"Rendah": 1.65, "Sedang": 1.76, "Tinggi": 2.10}[aktivitas]
-        else:
-            faktor_aktivitas = {"Rendah": 1.55, "Sedang": 1.70, "Tinggi": 2.00}[aktivitas]
-        kebutuhan_kalori = max((bmr * faktor_aktivitas) - (500 if defisit_opsi == "Defisit 500 kkal" else 750 if defisit_opsi == "Defisit 750 kkal" else 0), 0)
+        # BMR dari registri rumus, faktor aktivitas skala PAL (berbeda per jenis kelamin)
+        defisit = {"Tanpa Defisit": 0, "Defisit 500 kkal": 500, "Defisit 750 kkal": 750}[defisit_opsi]
+        target = calorie_targets(jenis_kelamin, berat, tinggi, usia, aktivitas,
+                                 formula=RUMUS_BMR[rumus], scale="pal", deficits=(defisit,), clamp=True)
+        kebutuhan_kalori = float(target[f"defisit_{defisit}"][0])
         st.success(f"🌟 Kebutuhan kalori harian Anda: {round(kebutuhan_kalori)} kkal")
 
-        target_sarapan = 0.35 * kebutuhan_kalori
-        target_siang = 0.35 * kebutuhan_kalori
-        target_malam = 0.30 * kebutuhan_kalori
-
-        # Tampilkan target kalori untuk debugging
-        # st.info(f"🎯 Target kalori: Sarapan {round(target_sarapan)} kkal, Siang {round(target_siang)} kkal, Malam {round(target_malam)} kkal")
-
-        # Ambil lebih banyak sampel dan gunakan semua data jika tersedia
-        karbo = df_clean[df_clean['type'].str.lower() == 'karbo']
-        lauk = df_clean[df_clean['type'].str.lower() == 'lauk']
-        sayur_masak = df_clean[df_clean['type'].str.lower() == 'sayuran masak']
-        buah = df_clean[df_clean['type'].str.lower() == 'buah']
-        camilan = df_clean[df_clean['type'].str.lower() == 'camilan']
-        minuman = df_clean[df_clean['type'].str.lower() == 'minuman']
-
-        # Jika data terlalu sedikit, gunakan semua data yang tersedia
-        if len(karbo) > 10:
-            karbo = karbo.sample(n=10, random_state=1)
-        if len(lauk) > 10:
-            lauk = lauk.sample(n=10, random_state=1)
-        if len(sayur_masak) > 10:
-            sayur_masak = sayur_masak.sample(n=10, random_state=1)
-        if len(buah) > 10:
-            buah = buah.sample(n=10, random_state=1)
-        if len(camilan) > 10:
-            camilan = camilan.sample(n=10, random_state=1)
-        if len(minuman) > 10:
-            minuman = minuman.sample(n=10, random_state=1)
-
-        tambahan_pagi_list = pd.concat([buah, minuman])
-        semua_kombinasi = []
-        
         # Toleransi yang lebih fleksibel berdasarkan kebutuhan kalori
-        toleransi_total = max(200, kebutuhan_kalori * 0.1)  # 10% dari kebutuhan kalori atau minimal 200
-        toleransi_per_waktu = max(150, target_sarapan * 0.15)  # 15% dari target per waktu makan
-
-        # st.info(f"📊 Toleransi: Total ±{round(toleransi_total)} kkal, Per waktu makan ±{round(toleransi_per_waktu)} kkal")
+        toleransi_total, toleransi_per_waktu = default_tolerances(kebutuhan_kalori)
 
         with st.spinner("🔄 Mencari kombinasi terbaik..."):
-            # Batasi jumlah iterasi untuk performa
-            max_iterasi = 1000
-            iterasi = 0
-            
-            for k, l1, tambahan_pagi in product(karbo.itertuples(), lauk.itertuples(), tambahan_pagi_list.itertuples()):
-                if iterasi >= max_iterasi:
-                    break
-                    
-                kal_sarapan = k.calories + l1.calories + tambahan_pagi.calories
-                if abs(kal_sarapan - target_sarapan) > toleransi_per_waktu:
-                    continue
-
-                for l2, s, k2 in product(lauk.itertuples(), sayur_masak.itertuples(), karbo.itertuples()):
-                    if iterasi >= max_iterasi:
-                        break
-                        
-                    kal_siang = l2.calories + s.calories + k2.calories
-                    if abs(kal_siang - target_siang) > toleransi_per_waktu:
-                        continue
-
-                    for b, c, m in product(buah.itertuples(), camilan.itertuples(), minuman.itertuples()):
-                        iterasi += 1
-                        if iterasi >= max_iterasi:
-                            break
-                            
-                        kal_malam = b.calories + c.calories + m.calories
-                        total = kal_sarapan + kal_siang + kal_malam
-                        selisih = abs(total - kebutuhan_kalori)
-
-                        if selisih <= toleransi_total:
-                            semua_kombinasi.append((selisih, (k, l1, tambahan_pagi, l2, s, k2, b, c, m)))
-
-        semua_kombinasi.sort(key=lambda x: x[0])
-        rekomendasi = [combo for _, combo in semua_kombinasi[:3]]
+            # Cari kombinasi dari seluruh katalog, bukan sampel acak (target
+            # dibulatkan ke 10 kkal dan hasilnya disimpan di cache indeks)
+            rekomendasi = knn_index.meal_plans(kebutuhan_kalori, n_plans=3)
+
+        judul_waktu = {
+            'sarapan': ("#### 🍽 Sarapan", "🍳 Total Kalori Sarapan"),
+            'siang': ("#### 🍼 Makan Siang", "🍱 Total Kalori Makan Siang"),
+            'malam': ("#### 🌚 Makan Malam", "🌙 Total Kalori Makan Malam"),
+        }
 
         if not rekomendasi:
             st.warning("❌ Tidak ditemukan kombinasi makanan yang mendekati target kalori Anda.")
-            st.info(f"Total kombinasi valid ditemukan: {len(semua_kombinasi)} kombinasi.")
-            
+
+            # Kategori makanan untuk informasi debugging (dari partisi per tipe, tanpa operasi string)
+            partisi = knn_index.type_partitions()
+            karbo = df_clean.iloc[partisi.rows('karbo')]
+            lauk = df_clean.iloc[partisi.rows('lauk')]
+            sayur_masak = df_clean.iloc[partisi.rows('sayuran masak')]
+            buah = df_clean.iloc[partisi.rows('buah')]
+            camilan = df_clean.iloc[partisi.rows('camilan')]
+            minuman = df_clean.iloc[partisi.rows('minuman')]
+
             # Tampilkan informasi debugging
             st.markdown("### 🔍 Informasi Debugging:")
             st.write(f"- Kebutuhan kalori: {round(kebutuhan_kalori)} kkal")
@@ -268,35 +289,58 @@ elif menu == "🔥 Hitung Kebutuhan Kalori":
                     for _, row in buah.head(3).iterrows():
                         st.write(f"- {row['name']}: {row['calories']} kkal")
         else:
-            for i, (k, l1, tambahan_pagi, l2, s, k2, b, c, m) in enumerate(rekomendasi, 1):
+            for i, rencana in enumerate(rekomendasi, 1):
                 st.markdown(f"### 🥗 Kombinasi #{i}")
 
-                # ======== SARAPAN ========
-                st.markdown("---")
-                st.markdown("#### 🍽 Sarapan")
-                tampilkan_makanan(pd.DataFrame([k._asdict(), l1._asdict(), tambahan_pagi._asdict()]))
-                total_sarapan = k.calories + l1.calories + tambahan_pagi.calories
-                st.info(f"🍳 Total Kalori Sarapan: **{round(total_sarapan)} kkal**")
+                for waktu, baris in rencana.meals.items():
+                    judul, label_total = judul_waktu[waktu]
+                    st.markdown("---")
+                    st.markdown(judul)
+                    tampilkan_makanan(df_clean.iloc[baris])
+                    st.info(f"{label_total}: **{round(rencana.meal_calories[waktu])} kkal**")
 
-                # ======== MAKAN SIANG ========
+                # ======== TOTAL HARIAN ========
+                st.success(f"🔥 Total Kalori Harian: **{round(rencana.total)} kkal**")
                 st.markdown("---")
-                st.markdown("#### 🍼 Makan Siang")
-                tampilkan_makanan(pd.DataFrame([l2._asdict(), s._asdict(), k2._asdict()]))
-                total_siang = l2.calories + s.calories + k2.calories
-                st.info(f"🍱 Total Kalori Makan Siang: **{round(total_siang)} kkal**")
 
-                # ======== MAKAN MALAM ========
-                st.markdown("---")
-                st.markdown("#### 🌚 Makan Malam")
-                tampilkan_makanan(pd.DataFrame([b._asdict(), c._asdict(), m._asdict()]))
-                total_malam = b.calories + c.calories + m.calories
-                st.info(f"🌙 Total Kalori Makan Malam: **{round(total_malam)} kkal**")
+        if rencana_mingguan:
+            with st.spinner("🔄 Menyusun rencana 7 hari..."):
+                target_makro = macro_targets(quantize(kebutuhan_kalori, 10))
+                minggu = knn_index.result_cache.get_or_compute(
+                    "weekly_plan", [target_makro["calories"], 7, 3],
+                    lambda: load_weekly_planner(data_version, df_clean).plan(target_makro, n_days=7, no_repeat_days=3))
+            st.markdown("## 📅 Rencana 7 Hari")
+            if minggu is None:
+                st.warning("❌ Tidak ditemukan rencana 7 hari yang memenuhi target dan batasan variasi.")
+            else:
+                st.caption(f"Target harian: {round(target_makro['calories'])} kkal, "
+                           f"protein {round(target_makro['proteins'])} g, lemak {round(target_makro['fat'])} g, "
+                           f"karbohidrat {round(target_makro['carbohydrate'])} g")
+                for hari, rencana in enumerate(minggu.days, 1):
+                    total = rencana.totals
+                    with st.expander(f"Hari {hari}: {round(total['calories'])} kkal, protein {round(total['proteins'])} g, "
+                                     f"lemak {round(total['fat'])} g, karbohidrat {round(total['carbohydrate'])} g"):
+                        for waktu, baris in rencana.meals.items():
+                            st.markdown(judul_waktu[waktu][0])
+                            tampilkan_makanan(df_clean.iloc[baris], key=f"minggu_{hari}_{waktu}")
 
-                # ======== TOTAL HARIAN ========
-                total = total_sarapan + total_siang + total_malam
-                st.success(f"🔥 Total Kalori Harian: **{round(total)} kkal**")
-                st.markdown("---")
 
+# Panel debug: timer per tahap, counter, teks Prometheus dan profil cProfile
+if MODE_DEBUG:
+    metrics.REGISTRY.observe("rerun", time.perf_counter() - awal_rerun)
+    with st.sidebar.expander("🛠 Debug: instrumentasi", expanded=True):
+        st.checkbox("Profil rerun berikutnya (cProfile)", key="profil_rerun")
+        if metrics.REGISTRY.profiling:
+            st.code(metrics.REGISTRY.stop_profiling(limit=20), language="text")
+        data_metrik = metrics.REGISTRY.snapshot()
+        st.dataframe(pd.DataFrame.from_dict(data_metrik["timers"], orient="index"))
+        st.json(data_metrik["counters"])
+        st.write("Cache hasil:", knn_index.result_cache.stats())
+        st.download_button("Unduh metrik (JSON)", metrics.REGISTRY.to_json(), file_name="metrik.json")
+        with st.popover("Teks Prometheus"):
+            st.code(metrics.REGISTRY.prometheus_text(), language="text")
+        if st.button("Reset metrik"):
+            metrics.REGISTRY.reset()
 
 # CSS tambahan
 st.markdown("""
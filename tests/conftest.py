@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nutrichoice import FoodIndex, clean, load_csv  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'nutrition.csv')
+
+
+@pytest.fixture(scope='session')
+def foods():
+    """Dataset nutrition.csv yang sudah dibersihkan (jangan diubah di test)."""
+    return clean(load_csv(DATA_PATH))
+
+
+@pytest.fixture
+def index(foods):
+    """FoodIndex baru (tanpa cache disk) untuk setiap test."""
+    return FoodIndex(foods.copy()).fit()
@@ -0,0 +1,10 @@
+from nutrichoice import benchmark
+
+
+def test_run_size_measures_every_stage(tmp_path):
+    results = benchmark.run_size(2_000, str(tmp_path), repeat=1, queries=10)
+    assert 'meal_plan' in results and results['meal_plan']['runs'] == 3
+    for stage, summary in results.items():
+        assert summary['p50_ms'] >= 0, stage
+        assert summary['rss_delta_mb'] is None or summary['rss_delta_mb'] >= 0, stage
+    assert 'meal_plan' in benchmark.format_report({'sizes': {'2000': results}})
@@ -0,0 +1,29 @@
+import pytest
+
+from nutrichoice.calories import calculate_calories, calorie_targets
+
+
+def test_calculate_calories_matches_original_formula():
+    bmr = 655.1 + 9.563 * 20 + 1.850 * 100 - 4.676 * 120
+    daily = bmr * 1.2
+    expected = tuple(round(v, 2) for v in (bmr, daily, daily - 500, daily - 750))
+    assert calculate_calories('wanita', 20, 100, 120, 'sedikit') == expected
+    # TDEE di bawah 750 kkal: defisit tetap dihitung apa adanya (negatif)
+    assert expected[3] < 0
+
+
+def test_clamp_is_opt_in():
+    profile = ('wanita', 20, 100, 120, 'sedikit')
+    assert calorie_targets(*profile)['defisit_750'][0] < 0
+    assert calorie_targets(*profile, clamp=True)['defisit_750'][0] == 0
+
+
+@pytest.mark.parametrize('gender', ['Pria', ' laki-laki ', 'Perempuan', 'WANITA'])
+def test_gender_labels(gender):
+    assert calorie_targets(gender, 60, 165, 30, 'sedang')['bmr'][0] > 0
+
+
+@pytest.mark.parametrize('gender', ['p', 'l', 'm', 'f', 'x'])
+def test_one_letter_gender_is_rejected(gender):
+    with pytest.raises(ValueError):
+        calorie_targets(gender, 60, 165, 30, 'sedang')
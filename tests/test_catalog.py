@@ -0,0 +1,55 @@
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from nutrichoice.catalog import Catalog, CatalogWriter, convert_csv, load_frame
+from nutrichoice.data import FEATURES, clean
+
+from .conftest import DATA_PATH
+
+
+def _is_mapped(array):
+    base = array
+    while base is not None and not isinstance(base, mmap.mmap):
+        base = base.obj if isinstance(base, memoryview) else getattr(base, 'base', None)
+    return base is not None
+
+
+def test_to_frame_shares_memory_with_files(tmp_path):
+    catalog = convert_csv(DATA_PATH, str(tmp_path / 'catalog'))
+    frame = catalog.to_frame()
+    raw = pd.read_csv(DATA_PATH, dtype=str)
+    assert len(frame) == len(raw)
+    for column in FEATURES:
+        assert _is_mapped(frame[column].to_numpy())
+        assert np.allclose(frame[column], pd.to_numeric(raw[column]), equal_nan=True)
+    assert (frame['name'].fillna('') == raw['name'].fillna('')).all()
+
+
+def test_string_columns_keep_missing_values(tmp_path):
+    writer = CatalogWriter(str(tmp_path / 'catalog'), ['calories'], ['name'])
+    writer.append(pd.DataFrame({'calories': ['1', '2', ''], 'name': ['Abon', None, 'Ésé']}))
+    catalog = writer.close()
+    names = catalog.to_frame()['name']
+    assert names.isna().tolist() == [False, True, False]
+    assert names[2] == 'Ésé'
+    assert list(catalog.strings('name')) == ['Abon', None, 'Ésé']
+
+
+def test_load_frame_accepts_catalog_folder(tmp_path):
+    path = str(tmp_path / 'catalog')
+    convert_csv(DATA_PATH, path)
+    assert len(load_frame(path)) == len(Catalog(path))
+
+
+def test_clean_keeps_mapped_columns_when_nothing_is_dropped(tmp_path):
+    writer = CatalogWriter(str(tmp_path / 'catalog'), FEATURES, ['name', 'type'])
+    writer.append(pd.DataFrame({'calories': ['100', '200'], 'proteins': ['1', '2'], 'fat': ['3', '4'],
+                                'carbohydrate': ['5', '6'], 'name': ['Abon', 'Tempe'], 'type': [' Lauk', 'lauk']}))
+    frame = writer.close().to_frame()
+    cleaned = clean(frame)
+    assert list(cleaned['type']) == ['lauk', 'lauk']
+    assert list(frame['type']) == [' Lauk', 'lauk']
+    if int(pd.__version__.split('.')[0]) >= 3:  # copy-on-write selalu aktif
+        assert all(_is_mapped(cleaned[column].to_numpy()) for column in FEATURES)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from nutrichoice.index import FoodIndex
+from nutrichoice.neighbor_table import NeighborTable
+from nutrichoice.result_cache import ResultCache
+
+
+def _assert_same_neighbors(index):
+    # Tabel hasil pembaruan inkremental sama dengan tabel yang dibangun
+    # ulang penuh dari data terkini dengan scaler yang sama
+    rebuilt = NeighborTable.build(index, k=index.neighbor_table.k)
+    assert np.allclose(index.neighbor_table.distances, rebuilt.distances, atol=1e-6)
+    row = index.lookup('Abon')
+    expected = index.df['name'].to_numpy()[rebuilt.indices[row]].tolist()
+    assert index.query('Abon')['name'].tolist() == [name for name in expected if name != 'Abon'][:4]
+
+
+def test_update_refreshes_neighbors(index):
+    index.neighbor_table = NeighborTable.build(index, k=5)
+    before = index.query('Abon')['name'].tolist()
+    index.update('Abon', {'calories': 900, 'fat': 90})
+    assert index.df.loc[index.lookup('Abon'), 'calories'] == 900
+    after = index.query('Abon')['name'].tolist()
+    assert after != before
+    assert any(name.startswith('Minyak') for name in after)
+    _assert_same_neighbors(index)
+
+
+def test_add_and_delete_match_full_rebuild(index):
+    index.neighbor_table = NeighborTable.build(index, k=5)
+    abon = index.df.loc[index.lookup('Abon'), ['calories', 'proteins', 'fat', 'carbohydrate']].to_dict()
+    index.add(dict(abon, name='Abon Tiruan', calories=abon['calories'] + 1))
+    _assert_same_neighbors(index)
+    assert index.query('Abon')['name'].iat[0] == 'Abon Tiruan'
+    index.delete('Abon Tiruan')
+    _assert_same_neighbors(index)
+    with pytest.raises(KeyError):
+        index.update('Abon Tiruan', {'calories': 1})
+
+
+def test_result_cache_follows_dataset_version(index):
+    index.use_result_cache(ResultCache())
+    first = index.query('Abon')
+    assert index.query('Abon') is first or index.query('Abon').equals(first)
+    index.update('Abon', {'calories': 900, 'fat': 90})
+    assert not index.query('Abon').equals(first)
+
+
+def test_query_weighted_filters_on_quantized_ranges(index):
+    row = index.lookup('Abon')
+    food = index.df.loc[row, index.features]
+    vector = food.to_numpy(dtype=float)
+    # Batas dibulatkan ke 0.01 untuk kunci cache, jadi filter juga harus
+    # memakai batas yang sama agar hasil tidak bergantung pada urutan query
+    below = index.query_weighted(vector=vector, ranges={'calories': (None, food['calories'] - 0.004)})
+    exact = index.query_weighted(vector=vector, ranges={'calories': (None, food['calories'])})
+    assert 'Abon' in below['name'].tolist()
+    assert below['name'].tolist() == exact['name'].tolist()
+
+
+def test_filtered_and_weighted_share_filter_key(index):
+    ranges, key = index._filter_key(['Lauk ', 'buah'], {'calories': (None, 149.996), 'fat': (1.004, 5)})
+    assert ranges == {'calories': (None, 150.0), 'fat': (1.0, 5.0)}
+    assert key == [['buah', 'lauk'], [('calories', [None, 150.0]), ('fat', [1.0, 5.0])]]
+    filters = dict(types=['lauk'], ranges={'calories': (None, 300)})
+    filtered = index.query_filtered('Abon', n_neighbors=4, **filters)
+    weighted = index.query_weighted('Abon', n_neighbors=4, **filters)
+    assert filtered['name'].tolist() == weighted['name'].tolist()
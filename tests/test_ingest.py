@@ -0,0 +1,31 @@
+import pandas as pd
+
+from nutrichoice.data import FEATURES, clean, load_csv
+from nutrichoice.ingest import ingest, name_key
+from nutrichoice.result_cache import normalize_name
+
+from .conftest import DATA_PATH
+
+
+def _rows(df):
+    return sorted(zip(df['name'].map(name_key), *(df[f].round(1) for f in FEATURES)))
+
+
+def test_bundled_dataset_keeps_all_previously_valid_rows(tmp_path):
+    baseline = clean(load_csv(DATA_PATH))
+    catalog, report = ingest(DATA_PATH, str(tmp_path / 'catalog'))
+    ingested = catalog.to_frame()
+    assert report['rows_written'] == len(baseline) == len(ingested)
+    assert _rows(ingested) == _rows(baseline)
+    assert report['warnings']['atwater'] > 0 and report['warnings']['di_luar_rentang'] > 0
+    assert 'Beras Siger' in set(ingested['name'])
+
+
+def test_strict_rejects_implausible_rows(tmp_path):
+    rejects = tmp_path / 'ditolak.csv'
+    catalog, report = ingest(DATA_PATH, str(tmp_path / 'catalog'), strict=True, rejects_path=str(rejects))
+    assert report['rejected']['atwater'] > 0 and not any(report['warnings'].values())
+    names = set(catalog.to_frame()['name'])
+    assert 'Beras Siger' not in names
+    reasons = pd.read_csv(rejects).set_index('name')['alasan']
+    assert reasons[normalize_name('Beras Siger')] == 'atwater'
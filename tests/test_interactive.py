@@ -0,0 +1,47 @@
+import pytest
+
+from nutrichoice.interactive import parse_amount, print_recommendations, resolve_food_name
+
+
+def test_resolve_exact_name(index):
+    assert resolve_food_name(index, 'Abon') == 'Abon'
+
+
+def test_resolve_case_only_difference_without_prompt(index):
+    def prompt(_):
+        raise AssertionError("tidak boleh bertanya")
+    assert resolve_food_name(index, 'abon', prompt=prompt) == 'Abon'
+
+
+def test_resolve_typo_uses_chosen_candidate(index, capsys):
+    assert resolve_food_name(index, 'Abn Haruwan', prompt=lambda _: '1') == 'Abon Haruwan'
+    assert "Mungkin yang Anda maksud" in capsys.readouterr().out
+
+
+def test_resolve_cancelled(index):
+    assert resolve_food_name(index, 'Abn Haruwan', prompt=lambda _: '') is None
+
+
+def test_print_recommendations(index, capsys):
+    print_recommendations(index.df.head(2))
+    out = capsys.readouterr().out
+    assert out.count('kkal') == 2 and 'Gambar:' in out
+
+
+def test_resolve_returns_dataset_spelling(index):
+    # Di dataset tertulis 'Martabak  Manis' (spasi ganda)
+    name = resolve_food_name(index, 'Martabak Manis')
+    assert name == index.df['name'].iat[index.lookup('Martabak Manis')]
+    assert (index.df['name'] == name).sum() == 1
+
+
+def test_parse_amount_single_values_and_ranges():
+    assert parse_amount('20') == 20.0
+    assert parse_amount(' -5 ') == -5.0
+    assert parse_amount('20-30') == (20.0, 30.0)
+    assert parse_amount(' 2.5 - 7 ') == (2.5, 7.0)
+    assert parse_amount('-5 - 10') == (-5.0, 10.0)
+    assert parse_amount('-10--5') == (-10.0, -5.0)
+    for text in ('', 'abc', '20-', '-', '1-2-3', 'nan', 'inf'):
+        with pytest.raises(ValueError):
+            parse_amount(text)
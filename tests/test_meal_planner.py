@@ -0,0 +1,84 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from nutrichoice.meal_planner import MEAL_SHARES, _MealCombos, default_tolerances, plan_meals
+from nutrichoice import weekly_planner
+from nutrichoice.weekly_planner import WeeklyPlanner, macro_targets, plan_weeks
+
+
+def _slots(seed, sizes=(7, 9, 11), high=30):
+    rng = np.random.default_rng(seed)
+    rows = [np.arange(n) + 100 * s for s, n in enumerate(sizes)]
+    units = [rng.integers(0, high, n) for n in sizes]
+    return rows, units
+
+
+def _brute_force(rows, units, target, tolerance):
+    return sorted(
+        (a, b, c)
+        for (a, ua), (b, ub), (c, uc) in itertools.product(*(zip(r.tolist(), u.tolist()) for r, u in zip(rows, units)))
+        if abs(ua + ub + uc - target) <= tolerance
+    )
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_combos_match_brute_force(seed):
+    rows, units = _slots(seed)
+    combos = _MealCombos(rows, units, 40, 5)
+    expected = _brute_force(rows, units, 40, 5)
+    assert len(combos) == len(expected)
+    assert sorted(map(tuple, combos.take(10 ** 6).tolist())) == expected
+    lookup = {r: u for rs, us in zip(rows, units) for r, u in zip(rs.tolist(), us.tolist())}
+    for value, count in zip(combos.values.tolist(), combos.counts.tolist()):
+        members = list(combos.members(value))
+        assert len(members) == count
+        assert all(sum(lookup[r] for r in combo) == value for combo in members)
+
+
+def test_take_is_capped_and_closest_first():
+    rows, units = _slots(1, sizes=(20, 20, 20))
+    combos = _MealCombos(rows, units, 40, 10)
+    taken = combos.take(50)
+    assert len(taken) == 50
+    lookup = {r: u for rs, us in zip(rows, units) for r, u in zip(rs.tolist(), us.tolist())}
+    deviations = [abs(sum(lookup[r] for r in combo) - 40) for combo in taken.tolist()]
+    assert deviations == sorted(deviations)
+
+
+def test_empty_slot_has_no_combos():
+    rows, units = _slots(0)
+    rows[2], units[2] = rows[2][:0], units[2][:0]
+    combos = _MealCombos(rows, units, 40, 5)
+    assert len(combos) == 0 and len(combos.take(10)) == 0
+
+
+@pytest.mark.parametrize('target', [1500, 2000, 2500])
+def test_plan_meals_respects_tolerances(foods, target):
+    plans = plan_meals(foods, target)
+    assert len(plans) == 3
+    total_tolerance, meal_tolerance = default_tolerances(target)
+    calories = foods['calories'].to_numpy()
+    for plan in plans:
+        assert abs(plan.total - target) <= total_tolerance
+        assert plan.total == pytest.approx(sum(calories[rows].sum() for rows in plan.meals.values()))
+        for meal, rows in plan.meals.items():
+            assert abs(calories[rows].sum() - MEAL_SHARES[meal] * target) <= meal_tolerance + 1e-6
+
+
+def test_weekly_plan_bounded_combinations(foods):
+    planner = WeeklyPlanner(foods, max_combinations=20_000)
+    week = planner.plan(macro_targets(2000), n_days=3)
+    assert week is not None and len(week.days) == 3
+
+
+def test_plan_weeks_runs_in_process_by_default(foods, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool tidak boleh dipakai")
+    monkeypatch.setattr(weekly_planner, 'ProcessPoolExecutor', no_pool)
+    targets = macro_targets(2000)
+    plans = plan_weeks(foods, [targets], n_days=2, max_combinations=20_000)
+    assert len(plans) == 1 and len(plans[0].days) == 2
+    # Satu tugas tidak memakai pool meski processes > 1
+    assert len(plan_weeks(foods, [targets], n_days=2, processes=4, max_combinations=20_000)) == 1
@@ -0,0 +1,22 @@
+import numpy as np
+
+from nutrichoice.neighbor_table import NeighborTable
+
+
+def test_save_and_load_memory_mapped(index, tmp_path):
+    table = NeighborTable.build(index, k=5)
+    path = table.save(NeighborTable.cache_path(str(tmp_path), index.version, 5))
+    loaded = NeighborTable.load(path, index.version)
+    assert isinstance(loaded.indices, np.memmap) and isinstance(loaded.distances, np.memmap)
+    assert np.array_equal(loaded.indices, table.indices)
+    assert np.array_equal(loaded.distances, table.distances)
+    assert NeighborTable.load(path, 'versi-lain') is None
+    assert NeighborTable.load(str(tmp_path / 'tidak-ada')) is None
+
+
+def test_refresh_does_not_touch_file(index, tmp_path):
+    path = NeighborTable.build(index, k=5).save(str(tmp_path / 'table'))
+    loaded = NeighborTable.load(path)
+    loaded.indices[0] = 0
+    loaded.refresh(index, [0])
+    assert np.array_equal(np.load(tmp_path / 'table' / 'indices.npy'), NeighborTable.build(index, k=5).indices)
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from nutrichoice.result_cache import ResultCache, normalize_name, quantize
+
+
+def test_normalize_and_quantize():
+    assert normalize_name('  Martabak  Manis ') == 'Martabak Manis'
+    assert quantize(149.996, 0.01) == 150.0
+    assert quantize(None, 10) is None
+
+
+def test_lru_eviction_and_stats():
+    cache = ResultCache(max_entries=2)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    for key in ('a', 'b', 'a', 'c', 'b'):
+        cache.get_or_compute('ns', [key], lambda key=key: compute(key))
+    # 'b' terbuang saat 'c' masuk karena 'a' baru dipakai
+    assert calls == ['a', 'b', 'c', 'b']
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 4 and stats['evictions'] == 2
+
+
+def test_results_are_copied_and_bound_to_version():
+    cache = ResultCache(version='v1')
+    frame = cache.get_or_compute('ns', 1, lambda: pd.DataFrame({'x': [1]}))
+    frame.loc[0, 'x'] = 99
+    assert cache.get_or_compute('ns', 1, lambda: None).loc[0, 'x'] == 1
+    cache.set_version('v2')
+    assert cache.get_or_compute('ns', 1, lambda: 'baru') == 'baru'
+
+
+def test_disk_tier_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    ResultCache(version='v1', disk_path=path).get_or_compute('ns', 'k', lambda: 42)
+    other = ResultCache(version='v1', disk_path=path)
+    assert other.get_or_compute('ns', 'k', lambda: None) == 42
+    assert other.stats()['disk_hits'] == 1
+    assert ResultCache(version='v2', disk_path=path).get_or_compute('ns', 'k', lambda: 7) == 7
+
+
+def test_nested_results_are_copied(index):
+    plans = index.meal_plans(2000, n_plans=1)
+    meal = next(iter(plans[0].meals))
+    plans[0].meals[meal].append(-1)
+    plans[0].meal_calories[meal] = 0
+    again = index.meal_plans(2000, n_plans=1)
+    assert -1 not in list(again[0].meals[meal]) and again[0].meal_calories[meal] != 0
+    assert index.result_cache.stats()['hits'] == 1
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from nutrichoice.server import MAX_BODY_BYTES, HTTPError, RecommendationService, _parse_body, _read_request
+
+
+def _call(service, path, **params):
+    async def run():
+        service.batcher.start()
+        try:
+            return await service.handle(path, {k: str(v) for k, v in params.items()})
+        finally:
+            service.batcher.stop()
+    return asyncio.run(run())
+
+
+def _status(service, path, **params):
+    with pytest.raises(HTTPError) as info:
+        _call(service, path, **params)
+    return info.value.status
+
+
+@pytest.fixture
+def service(index):
+    return RecommendationService(index)
+
+
+def test_k_is_validated(service):
+    assert len(_call(service, '/recommend', name='Abon', k=3)['results']) == 3
+    assert len(_call(service, '/similar', calories=250, proteins=10, fat=8, carbohydrate=30, k=100)['results']) == 100
+    for k in (-2, 0, 5000, 'x'):
+        assert _status(service, '/recommend', name='Abon', k=k) == 400
+        assert _status(service, '/similar', calories=250, proteins=10, fat=8, carbohydrate=30, k=k) == 400
+    assert _status(service, '/nutrient', nutrient='proteins', value=20, k=-1) == 400
+
+
+def test_nutrient_only_accepts_features(service):
+    assert len(_call(service, '/nutrient', nutrient='proteins', value=20, k=4)['results']) == 4
+    assert _call(service, '/nutrient', nutrient='fat', low=0, high=0.1)['results']
+    for column in ('name', 'image', 'type', ''):
+        assert _status(service, '/nutrient', nutrient=column, value=1) == 400
+
+
+def test_weighted_query_runs_in_executor(service):
+    result = _call(service, '/recommend', name='Abon', k=3, weights='proteins=3')
+    assert len(result['results']) == 3
+    assert _status(service, '/recommend', name='Abon', weights='gula=2') == 400
+
+
+def test_post_body_must_be_object():
+    assert _parse_body(b'{"target": 2000, "n": 2}') == {'target': '2000', 'n': '2'}
+    for body in (b'[1, 2]', b'"teks"', b'{', b'\xff'):
+        with pytest.raises(HTTPError) as info:
+            _parse_body(body)
+        assert info.value.status == 400
+
+
+def test_body_size_is_limited():
+    async def read(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await _read_request(reader)
+
+    request = asyncio.run(read(b'POST /meal-plan HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}'))
+    assert request[0] == 'POST' and request[3] == b'{}'
+    with pytest.raises(HTTPError) as info:
+        asyncio.run(read(f'POST /meal-plan HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n'.encode()))
+    assert info.value.status == 413
+    with pytest.raises(ValueError):
+        asyncio.run(read(b'POST /meal-plan HTTP/1.1\r\nContent-Length: -1\r\n\r\n'))
+
+
+def test_numbers_must_be_finite_and_bounded(service):
+    assert len(_call(service, '/meal-plan', target=2000, n=1)['plans']) == 1
+    for target in (1e9, 'nan', 'inf', -100, 0):
+        assert _status(service, '/meal-plan', target=target) == 400
+    assert _status(service, '/similar', calories='inf', proteins=10, fat=8, carbohydrate=30) == 400
+    assert _status(service, '/nutrient', nutrient='fat', value='nan') == 400
+    profile = dict(gender='pria', weight=70, height=170, age=30, activity='sedang')
+    assert _call(service, '/calories', **profile)['bmr'] > 0
+    for key, value in (('weight', 'inf'), ('weight', -70), ('height', 5000), ('age', 1000)):
+        assert _status(service, '/calories', **dict(profile, **{key: value})) == 400
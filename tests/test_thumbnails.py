@@ -0,0 +1,104 @@
+import io
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nutrichoice.thumbnails import ThumbnailCache, http_get
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _png(color, size=(400, 300)):
+    out = io.BytesIO()
+    Image.new('RGB', size, color).save(out, format='PNG')
+    return out.getvalue()
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    """Folder gambar yang dilayani http.server lokal; ``requests`` mencatat path yang diminta."""
+    root = tmp_path / 'gambar'
+    root.mkdir()
+    requests = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(Handler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield root, base, requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_prefetch_from_http_and_rebuild(image_server, tmp_path):
+    root, base, requests = image_server
+    (root / 'merah.png').write_bytes(_png('red'))
+    (root / 'biru.png').write_bytes(_png('blue'))
+    (root / 'merah-lagi.png').write_bytes(_png('red'))
+    urls = [f"{base}/merah.png", f"{base}/biru.png", f"{base}/merah-lagi.png", f"{base}/hilang.png"]
+
+    cache = ThumbnailCache(str(tmp_path / 'cache'), width=100)
+    assert cache.prefetch(urls, workers=2) == {'cached': 0, 'fetched': 3, 'failed': 1, 'evicted': 0}
+    with Image.open(io.BytesIO(cache.get(urls[0]))) as thumbnail:
+        assert thumbnail.size == (100, 75) and thumbnail.format == 'JPEG'
+    # Isi yang sama dari dua URL disimpan sebagai satu blob
+    assert cache.get(urls[0]) == cache.get(urls[2])
+    assert len(list((tmp_path / 'cache' / 'blobs').iterdir())) == 2
+
+    # Prefetch berikutnya tidak mengunduh ulang yang sudah ada
+    requests.clear()
+    assert cache.prefetch(urls)['cached'] == 3
+    assert requests == ['/hilang.png']
+
+    # Folder cache yang dihapus dibangun ulang dari server
+    rebuilt = ThumbnailCache(str(tmp_path / 'cache-baru'), width=100)
+    assert rebuilt.prefetch(urls)['fetched'] == 3
+    assert rebuilt.get(urls[1]) == cache.get(urls[1])
+
+
+def test_refresh_and_eviction_invalidate(image_server, tmp_path):
+    root, base, requests = image_server
+    url = f"{base}/makanan.png"
+    (root / 'makanan.png').write_bytes(_png('green'))
+    cache = ThumbnailCache(str(tmp_path / 'cache'))
+    cache.prefetch([url])
+    old = cache.get(url)
+
+    # Gambar di server berubah: tanpa refresh isi cache lama dipakai
+    (root / 'makanan.png').write_bytes(_png('yellow'))
+    assert cache.prefetch([url])['cached'] == 1 and cache.get(url) == old
+    assert cache.prefetch([url], refresh=True)['fetched'] == 1
+    assert cache.get(url) != old
+
+    # Blob yang dibuang karena batas ukuran dianggap miss lalu diunduh lagi
+    cache.max_bytes = 0
+    assert cache.evict() >= 1
+    assert not cache.contains(url) and cache.get(url) is None
+    requests.clear()
+    cache.max_bytes = 10 * 1024 * 1024
+    assert cache.prefetch([url])['fetched'] == 1 and requests == ['/makanan.png']
+    assert cache.contains(url)
+
+
+def test_only_http_and_data_urls_are_fetched(image_server, tmp_path):
+    root, base, requests = image_server
+    secret = tmp_path / 'rahasia.txt'
+    secret.write_text('kata sandi')
+    cache = ThumbnailCache(str(tmp_path / 'cache'))
+    urls = [secret.as_uri(), 'ftp://127.0.0.1/gambar.png', 'FILE:///etc/passwd', 'gambar.png']
+    assert cache.prefetch(urls)['failed'] == len(urls)
+    assert not any(cache.contains(url) for url in urls)
+    for url in urls:
+        with pytest.raises(ValueError):
+            http_get(url)
+    assert http_get('data:text/plain,halo') == b'halo'